@@ -0,0 +1,165 @@
+"""
+Batch request multiplexing for the API Gateway.
+POST /batch carries several sub-requests; each one is dispatched through the
+gateway app in-process (auth, rate limiting, caching and the pooled upstream
+clients all apply as for a normal request) and keeps its own status code.
+"""
+
+import asyncio
+import json
+import posixpath
+import re
+from urllib.parse import quote, unquote
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+from starlette.types import ASGIApp, Message, Scope
+import logging
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_METHODS = {"GET", "POST", "PUT", "DELETE"}
+
+# Batch-level headers that don't describe the sub-requests
+NON_INHERITED_HEADERS = {
+    "content-length",
+    "content-type",
+    "transfer-encoding",
+    "accept-encoding",
+    "if-none-match",
+    "if-match",
+    "expect",
+    "connection",
+}
+
+# Sub-response headers worth returning to the client
+RETURNED_HEADERS = (
+    "content-type",
+    "etag",
+    "cache-control",
+    "retry-after",
+    "x-cache",
+    "x-ratelimit-limit",
+    "x-ratelimit-remaining",
+)
+
+
+class BatchRequestItem(BaseModel):
+    id: Optional[str] = None
+    method: str = "GET"
+    path: str
+    headers: Dict[str, str] = Field(default_factory=dict)
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchRequestItem]
+
+
+def _error(item: BatchRequestItem, status_code: int, detail: str) -> dict:
+    return {"id": item.id, "status": status_code, "headers": {}, "body": {"detail": detail}}
+
+
+def normalize_path(raw: str) -> Optional[str]:
+    """
+    Percent-decode a sub-request path and collapse duplicate slashes, '.' and
+    '..' segments, so it is checked and dispatched as the same value.
+    Returns None if the path is not absolute.
+    """
+    path = unquote(raw)
+    if not path.startswith("/"):
+        return None
+    normalized = posixpath.normpath(re.sub(r"/{2,}", "/", path))
+    if path.endswith("/") and normalized != "/":
+        normalized += "/"
+    return normalized
+
+
+async def dispatch_subrequest(app: ASGIApp, parent_scope: Scope, item: BatchRequestItem) -> dict:
+    """Run one sub-request through the app and collect its response"""
+    method = item.method.upper()
+    if method not in ALLOWED_METHODS:
+        return _error(item, 405, f"Method {method} not allowed in batch")
+
+    raw_path, _, query = item.path.partition("?")
+    path = normalize_path(raw_path)
+    # No nested batches: each would fan out again outside load shedding
+    if path is None or path.rstrip("/") == "/batch":
+        return _error(item, 400, "Invalid sub-request path")
+
+    body = json.dumps(item.body).encode() if item.body is not None else b""
+
+    headers = [
+        (name, value)
+        for name, value in parent_scope["headers"]
+        if name.decode("latin-1") not in NON_INHERITED_HEADERS
+    ]
+    overrides = {name.lower(): value for name, value in item.headers.items()}
+    headers = [(name, value) for name, value in headers if name.decode("latin-1") not in overrides]
+    headers += [(name.encode("latin-1"), value.encode("latin-1")) for name, value in overrides.items()]
+    if body:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+
+    scope = {
+        key: parent_scope[key]
+        for key in ("type", "asgi", "http_version", "scheme", "server", "client", "root_path")
+        if key in parent_scope
+    }
+    scope.update({
+        "method": method,
+        "path": path,
+        "raw_path": quote(path).encode(),
+        "query_string": query.encode(),
+        "headers": headers,
+    })
+
+    response_started: Dict[str, Any] = {}
+    chunks: List[bytes] = []
+    finished = asyncio.Event()
+    body_sent = False
+
+    async def receive() -> Message:
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message):
+        if message["type"] == "http.response.start":
+            response_started.update(message)
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    try:
+        await app(scope, receive, send)
+    except Exception as e:
+        logger.error(f"Batch sub-request {method} {path} failed: {e}")
+        if not response_started:
+            return _error(item, 500, "Internal error")
+    finally:
+        finished.set()
+
+    response_headers = {
+        name.decode("latin-1").lower(): value.decode("latin-1")
+        for name, value in response_started.get("headers", [])
+    }
+    content = b"".join(chunks)
+
+    response_body = None
+    if content and "application/json" in response_headers.get("content-type", ""):
+        try:
+            response_body = json.loads(content)
+        except ValueError:
+            pass
+    if content and response_body is None:
+        response_body = content.decode("utf-8", errors="replace")
+
+    return {
+        "id": item.id,
+        "status": response_started.get("status", 500),
+        "headers": {name: response_headers[name] for name in RETURNED_HEADERS if name in response_headers},
+        "body": response_body,
+    }
@@ -0,0 +1,95 @@
+"""
+Background upstream health prober for the API Gateway.
+Checks all upstreams concurrently on an interval and keeps the latest
+snapshot in memory, so /health answers immediately. Health changes are
+reported to on_health (the gateway opens the upstream's circuit breaker
+while it keeps failing probes and half-opens it once a probe passes).
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+import logging
+
+from shared.tracing import untraced
+from upstreams import UpstreamClients
+
+logger = logging.getLogger(__name__)
+
+
+class HealthProber:
+    """Periodically probes GET /health on every upstream"""
+
+    def __init__(
+        self,
+        upstreams: UpstreamClients,
+        interval: float = 5.0,
+        timeout: float = 2.0,
+        failure_threshold: int = 2,
+        on_health: Optional[Callable[[str, bool], None]] = None
+    ):
+        self.upstreams = upstreams
+        self.interval = interval
+        self.timeout = timeout
+        # Called as on_health(upstream, healthy): True after a passing probe,
+        # False once failure_threshold probes in a row have failed
+        self.failure_threshold = failure_threshold
+        self.on_health = on_health
+        self.results: Dict[str, dict] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Run one probe round synchronously, then keep probing in the background"""
+        await self.probe_all()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"✅ Health prober started (interval={self.interval}s)")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.error(f"Health probe round failed: {e}")
+
+    async def probe_all(self):
+        """Probe every upstream concurrently"""
+        await asyncio.gather(*(self.probe(name) for name in self.upstreams.clients))
+
+    async def probe(self, name: str):
+        previous = self.results.get(name, {})
+        start = time.perf_counter()
+        try:
+            # Probes are background noise: don't start a trace for each one
+            with untraced():
+                response = await self.upstreams.get(name).get("/health", timeout=self.timeout)
+            state = "healthy" if response.status_code == 200 else "unhealthy"
+        except Exception:
+            state = "unreachable"
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        consecutive_failures = 0 if state == "healthy" else previous.get("consecutive_failures", 0) + 1
+        self.results[name] = {
+            "status": state,
+            "latency_ms": round(latency_ms, 2),
+            "checked_at": datetime.utcnow().isoformat(),
+            "consecutive_failures": consecutive_failures,
+        }
+
+        if self.on_health and (state == "healthy" or consecutive_failures >= self.failure_threshold):
+            try:
+                self.on_health(name, state == "healthy")
+            except Exception as e:
+                logger.error(f"Health probe callback failed for '{name}': {e}")
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {name: dict(result) for name, result in self.results.items()}
@@ -0,0 +1,188 @@
+"""
+Adaptive concurrency limiting and priority lanes for the API Gateway.
+
+Each route class has an AIMD concurrency limit driven by observed latency:
+the limit grows additively while latency stays under the class target and
+is cut multiplicatively when it exceeds it. On top of that, a gateway-wide
+in-flight budget is shared by priority: low-priority traffic (anonymous
+browsing) may only use part of it, so money-moving routes keep headroom
+when capacity is short.
+"""
+
+import asyncio
+import re
+import time
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Route classes, highest priority first
+PAYMENTS = "payments"
+DEFAULT = "default"
+BROWSE = "browse"
+PRIORITY_ORDER = (PAYMENTS, DEFAULT, BROWSE)
+
+MONEY_ROUTE = re.compile(r"^/jobs/\d+/(accept|complete)/?$")
+BROWSE_ROUTE = re.compile(r"^/jobs(/\d+)?/?$")
+
+
+def classify_request(method: str, path: str, authenticated: bool) -> str:
+    """Map a request to its route class"""
+    if path.startswith(("/escrow", "/payment/escrow")) or MONEY_ROUTE.match(path):
+        return PAYMENTS
+    if method == "GET" and not authenticated and BROWSE_ROUTE.match(path):
+        return BROWSE
+    return DEFAULT
+
+
+class AIMDLimiter:
+    """Additive-increase / multiplicative-decrease concurrency limit for one route class"""
+
+    def __init__(
+        self,
+        name: str,
+        latency_target_ms: float,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        backoff: float = 0.8
+    ):
+        self.name = name
+        self.latency_target_ms = latency_target_ms
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+
+        self.in_flight = 0
+        self.rejected = 0
+        self.last_decrease = 0.0
+        self.latency_ewma_ms: Optional[float] = None
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, latency_ms: float, dropped: bool = False):
+        self.in_flight -= 1
+        self.latency_ewma_ms = (
+            latency_ms if self.latency_ewma_ms is None
+            else 0.9 * self.latency_ewma_ms + 0.1 * latency_ms
+        )
+
+        now = time.monotonic()
+        if dropped or latency_ms > self.latency_target_ms:
+            # Back off at most once per target-latency window so one burst
+            # of slow replies doesn't collapse the limit
+            if now - self.last_decrease > self.latency_target_ms / 1000:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self.last_decrease = now
+        elif self.in_flight + 1 >= int(self.limit) * 0.5:
+            # Only grow while the limit is actually being used; +1/limit per
+            # completion adds about one slot per round of requests
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def get_stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+            "latency_target_ms": self.latency_target_ms,
+            "latency_ewma_ms": round(self.latency_ewma_ms, 2) if self.latency_ewma_ms is not None else None,
+        }
+
+
+class LoadShedder:
+    """
+    Admission control: per-class AIMD limits plus priority shares of a global budget.
+    Requests that don't fit wait briefly for a slot (longer for higher
+    priority); lower-priority classes can't take a freed slot while a
+    higher-priority request is waiting.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 200,
+        latency_targets_ms: Optional[Dict[str, float]] = None,
+        shares: Optional[Dict[str, float]] = None,
+        max_wait: Optional[Dict[str, float]] = None
+    ):
+        latency_targets_ms = latency_targets_ms or {}
+        self.max_in_flight = max_in_flight
+        # Fraction of the global budget each class may fill; payments can use all of it
+        self.shares = shares or {PAYMENTS: 1.0, DEFAULT: 0.9, BROWSE: 0.7}
+        # Seconds a request may queue for a slot before being shed
+        self.max_wait = max_wait or {PAYMENTS: 2.0, DEFAULT: 0.5, BROWSE: 0.1}
+        self.limiters = {
+            PAYMENTS: AIMDLimiter(PAYMENTS, latency_targets_ms.get(PAYMENTS, 15000), max_limit=max_in_flight),
+            DEFAULT: AIMDLimiter(DEFAULT, latency_targets_ms.get(DEFAULT, 2000), max_limit=max_in_flight),
+            BROWSE: AIMDLimiter(BROWSE, latency_targets_ms.get(BROWSE, 500), max_limit=max_in_flight),
+        }
+        self.in_flight = 0
+        self.waiting = {name: 0 for name in PRIORITY_ORDER}
+        self._slot_freed = asyncio.Condition()
+
+    def _higher_priority_waiting(self, route_class: str) -> bool:
+        for name in PRIORITY_ORDER:
+            if name == route_class:
+                return False
+            if self.waiting[name]:
+                return True
+        return False
+
+    def _try_acquire(self, route_class: str) -> bool:
+        if self._higher_priority_waiting(route_class):
+            return False
+        if self.in_flight >= self.max_in_flight * self.shares[route_class]:
+            return False
+        if not self.limiters[route_class].try_acquire():
+            return False
+        self.in_flight += 1
+        return True
+
+    async def acquire(self, route_class: str) -> bool:
+        """Admit a request, waiting up to the class's max_wait; False means shed it"""
+        if self._try_acquire(route_class):
+            return True
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait[route_class]
+        self.waiting[route_class] += 1
+        try:
+            async with self._slot_freed:
+                while True:
+                    # Waiting doesn't block our own class
+                    self.waiting[route_class] -= 1
+                    admitted = self._try_acquire(route_class)
+                    self.waiting[route_class] += 1
+                    if admitted:
+                        return True
+
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        self.limiters[route_class].rejected += 1
+                        return False
+                    try:
+                        await asyncio.wait_for(self._slot_freed.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self.waiting[route_class] -= 1
+
+    async def release(self, route_class: str, latency_ms: float, dropped: bool = False):
+        self.in_flight -= 1
+        self.limiters[route_class].release(latency_ms, dropped)
+        if any(self.waiting.values()):
+            async with self._slot_freed:
+                self._slot_freed.notify_all()
+
+    def get_stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "waiting": dict(self.waiting),
+            "classes": {name: limiter.get_stats() for name, limiter in self.limiters.items()},
+        }
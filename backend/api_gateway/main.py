@@ -1,10 +1,31 @@
 from fastapi import FastAPI, Request, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 from starlette.middleware.base import BaseHTTPMiddleware
 import httpx
+import asyncio
 import os
+import time
+import hashlib
 import logging
+from typing import Optional
+
+from upstreams import UpstreamClients
+from response_cache import ResponseCache
+from single_flight import SingleFlight
+from health_prober import HealthProber
+from resilience import UpstreamGuards, UpstreamUnavailable, parse_limits
+from load_shedding import LoadShedder, classify_request
+from compression import CompressionMiddleware
+from batch import BatchRequest, dispatch_subrequest
+from metrics import MetricsMiddleware, observe_auth, observe_deadline_expired, observe_upstream, route_template, registry
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from shared.internal_identity import INTERNAL_IDENTITY_HEADER, sign_identity
+from shared.rate_limiter import RateLimiter, client_ip, rate_limit_headers
+from shared.tracing import TracingMiddleware, get_tracer
+from shared.deadline import DEADLINE_HEADER, DEADLINE_HOOKS, DeadlineMiddleware, clear_deadline
+from shared.deadline import get_stats as get_deadline_stats
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,6 +38,143 @@ JOB_SERVICE_URL = os.getenv("JOB_SERVICE_URL", "http://job-service:8002")
 PAYMENT_SERVICE_URL = os.getenv("PAYMENT_SERVICE_URL", "http://payment-service:8003")
 CORS_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "http://localhost:5173").split(",")
 
+# Request tracing (TRACING_* settings); the gateway starts the trace for each request
+tracer = get_tracer("api-gateway")
+
+# Upstream connection pools
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "30"))
+POOL_MAX_CONNECTIONS = int(os.getenv("GATEWAY_POOL_MAX_CONNECTIONS", "100"))
+POOL_MAX_KEEPALIVE = int(os.getenv("GATEWAY_POOL_MAX_KEEPALIVE", "20"))
+POOL_KEEPALIVE_EXPIRY = float(os.getenv("GATEWAY_POOL_KEEPALIVE_EXPIRY", "30"))
+GATEWAY_HTTP2 = os.getenv("GATEWAY_HTTP2", "false").lower() == "true"
+
+upstreams = UpstreamClients(
+    {
+        "user": USER_SERVICE_URL,
+        "job": JOB_SERVICE_URL,
+        "payment": PAYMENT_SERVICE_URL,
+    },
+    max_connections=POOL_MAX_CONNECTIONS,
+    max_keepalive_connections=POOL_MAX_KEEPALIVE,
+    keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+    http2=GATEWAY_HTTP2,
+    timeout=UPSTREAM_TIMEOUT,
+    tracer=tracer,
+    event_hooks=DEADLINE_HOOKS
+)
+
+# Overall time budget per request, propagated downstream in X-Request-Timeout-Ms.
+# Clients may ask for less (same header), never for more.
+REQUEST_TIMEOUT = float(os.getenv("GATEWAY_REQUEST_TIMEOUT", str(UPSTREAM_TIMEOUT)))
+
+# Circuit breakers and bulkheads, one of each per upstream
+BULKHEAD_MAX_CONCURRENT = int(os.getenv("GATEWAY_BULKHEAD_MAX_CONCURRENT", "50"))
+BULKHEAD_LIMITS = parse_limits(os.getenv("GATEWAY_BULKHEAD_LIMITS", ""))  # e.g. "payment=20,job=100"
+BULKHEAD_MAX_WAIT = float(os.getenv("GATEWAY_BULKHEAD_MAX_WAIT", "0.5"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("GATEWAY_CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_SLOW_CALL_MS = float(os.getenv("GATEWAY_CIRCUIT_SLOW_CALL_MS", "10000"))
+CIRCUIT_RECOVERY_TIMEOUT = float(os.getenv("GATEWAY_CIRCUIT_RECOVERY_TIMEOUT", "30"))
+
+upstream_guards = UpstreamGuards(
+    upstreams.base_urls,
+    bulkhead_limits=BULKHEAD_LIMITS,
+    default_max_concurrent=BULKHEAD_MAX_CONCURRENT,
+    max_wait=BULKHEAD_MAX_WAIT,
+    failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+    slow_call_ms=CIRCUIT_SLOW_CALL_MS,
+    recovery_timeout=CIRCUIT_RECOVERY_TIMEOUT,
+    observer=observe_upstream
+)
+
+# Adaptive (AIMD) concurrency limits per route class with priority lanes
+LOAD_SHEDDING_ENABLED = os.getenv("GATEWAY_LOAD_SHEDDING_ENABLED", "true").lower() == "true"
+MAX_IN_FLIGHT = int(os.getenv("GATEWAY_MAX_IN_FLIGHT", "200"))
+LATENCY_TARGETS_MS = parse_limits(
+    os.getenv("GATEWAY_LATENCY_TARGETS_MS", "payments=15000,default=2000,browse=500"),
+    cast=float
+)
+
+load_shedder = LoadShedder(max_in_flight=MAX_IN_FLIGHT, latency_targets_ms=LATENCY_TARGETS_MS)
+
+# Background health probing of upstreams
+HEALTH_PROBE_INTERVAL = float(os.getenv("GATEWAY_HEALTH_PROBE_INTERVAL", "5"))
+HEALTH_PROBE_TIMEOUT = float(os.getenv("GATEWAY_HEALTH_PROBE_TIMEOUT", "2"))
+# Failed probes in a row before the upstream's circuit is opened
+HEALTH_PROBE_FAILURE_THRESHOLD = int(os.getenv("GATEWAY_HEALTH_PROBE_FAILURE_THRESHOLD", "2"))
+
+health_prober = HealthProber(
+    upstreams,
+    interval=HEALTH_PROBE_INTERVAL,
+    timeout=HEALTH_PROBE_TIMEOUT,
+    failure_threshold=HEALTH_PROBE_FAILURE_THRESHOLD,
+    on_health=upstream_guards.record_health
+)
+
+# Response cache for public GET routes (anonymous browse traffic)
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379")
+CACHE_ENABLED = os.getenv("GATEWAY_CACHE_ENABLED", "true").lower() == "true"
+CACHE_TTL_JOBS_LIST = int(os.getenv("GATEWAY_CACHE_TTL_JOBS_LIST", "10"))
+CACHE_TTL_JOB_DETAIL = int(os.getenv("GATEWAY_CACHE_TTL_JOB_DETAIL", "30"))
+
+response_cache = ResponseCache(REDIS_URL, enabled=CACHE_ENABLED)
+
+# Distributed rate limiting: path prefix -> rate, per wallet (verified JWT) or client IP.
+# '*' applies to everything else; the longest matching prefix wins.
+RATE_LIMIT_ENABLED = os.getenv("GATEWAY_RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMITS = parse_limits(
+    os.getenv("GATEWAY_RATE_LIMITS", "/auth=30/minute,/escrow=60/minute,/payment/escrow=60/minute,*=600/minute"),
+    cast=str
+)
+# Behind nginx the peer address is the proxy; trust its X-Forwarded-For instead
+TRUST_FORWARDED = os.getenv("GATEWAY_TRUST_FORWARDED", "false").lower() == "true"
+rate_limiter = RateLimiter(
+    REDIS_URL,
+    prefix="ratelimit:gateway",
+    redis_timeout=float(os.getenv("GATEWAY_RATE_LIMIT_REDIS_TIMEOUT_MS", "50")) / 1000
+)
+
+# Request coalescing (single-flight) for identical concurrent GETs, opt-in per route
+# template. Cache misses are always coalesced; other requests on routes not listed
+# here go through proxy_request (and so honour GATEWAY_PROXY_MODE)
+COALESCE_ROUTES = {
+    route.strip()
+    for route in os.getenv("GATEWAY_COALESCE_ROUTES", "").split(",")
+    if route.strip()
+}
+
+single_flight = SingleFlight()
+
+# Gateway-terminated JWT verification: verify once here (incl. blacklist) and
+# forward a signed X-Internal-Identity header that services check with one HMAC
+GATEWAY_VERIFY_JWT = os.getenv("GATEWAY_VERIFY_JWT", "false").lower() == "true"
+
+if GATEWAY_VERIFY_JWT:
+    # Needs JWT_SECRET_KEY / INTERNAL_IDENTITY_SECRET / REDIS_URL from the shared settings
+    from shared.auth_guard import auth_guard
+
+# Prometheus metrics on GET /metrics
+METRICS_ENABLED = os.getenv("GATEWAY_METRICS_ENABLED", "true").lower() == "true"
+
+# POST /batch: sub-requests per call
+BATCH_MAX_REQUESTS = int(os.getenv("GATEWAY_BATCH_MAX_REQUESTS", "20"))
+
+# Proxy mode: "buffered" re-encodes JSON replies, "streaming" passes bodies through untouched
+PROXY_MODE = os.getenv("GATEWAY_PROXY_MODE", "buffered").lower()
+
+# Hop-by-hop headers (RFC 7230 §6.1) must not be forwarded by a proxy
+HOP_BY_HOP_HEADERS = frozenset({
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "proxy-connection",
+    "te",
+    "trailer",
+    "trailers",
+    "transfer-encoding",
+    "upgrade",
+})
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -27,6 +185,18 @@ app.add_middleware(
 )
 
 
+# Response compression (gzip, or brotli when installed) for bodies above the threshold
+COMPRESSION_ENABLED = os.getenv("GATEWAY_COMPRESSION_ENABLED", "true").lower() == "true"
+
+if COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=int(os.getenv("GATEWAY_COMPRESSION_MIN_SIZE", "1024")),
+        gzip_level=int(os.getenv("GATEWAY_COMPRESSION_LEVEL", "6")),
+        brotli_quality=int(os.getenv("GATEWAY_BROTLI_QUALITY", "4"))
+    )
+
+
 # Security headers middleware
 @app.middleware("http")
 async def add_security_headers(request: Request, call_next):
@@ -50,7 +220,9 @@ async def add_security_headers(request: Request, call_next):
 class AuthMiddleware(BaseHTTPMiddleware):
     """
     Centralized authentication middleware for API Gateway.
-    Validates JWT tokens for protected routes.
+    Validates JWT tokens for protected routes. With GATEWAY_VERIFY_JWT enabled,
+    bearer tokens are fully verified here and replaced downstream by a signed
+    internal identity header.
     """
     
     # Routes that don't require authentication
@@ -71,6 +243,18 @@ class AuthMiddleware(BaseHTTPMiddleware):
         "/payment/escrow",
     ]
     
+    @staticmethod
+    def _unauthorized(detail: str) -> JSONResponse:
+        return JSONResponse(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            content={"detail": detail},
+            headers={
+                "WWW-Authenticate": "Bearer",
+                "Access-Control-Allow-Origin": "*",
+                "Access-Control-Allow-Credentials": "true"
+            }
+        )
+    
     async def dispatch(self, request: Request, call_next):
         path = request.url.path
         
@@ -82,102 +266,355 @@ class AuthMiddleware(BaseHTTPMiddleware):
         if any(path.startswith(route) for route in self.PUBLIC_ROUTES):
             return await call_next(request)
         
+        start = time.perf_counter()
+        
         # Check if route requires authentication
         requires_auth = any(path.startswith(route) for route in self.PROTECTED_ROUTES)
         
-        if requires_auth:
-            auth_header = request.headers.get("Authorization")
+        auth_header = request.headers.get("Authorization")
+        has_bearer = bool(auth_header) and auth_header.startswith("Bearer ")
+        
+        if requires_auth and not has_bearer:
+            observe_auth("rejected", time.perf_counter() - start)
+            return self._unauthorized("Not authenticated")
+        
+        outcome = "forwarded" if has_bearer else "anonymous"
+        
+        # Without GATEWAY_VERIFY_JWT, token validation is done at the service level
+        # and the gateway just checks presence and format
+        if GATEWAY_VERIFY_JWT and has_bearer:
+            try:
+                payload = await auth_guard.verify_token(auth_header)
+            except HTTPException as e:
+                if requires_auth:
+                    observe_auth("rejected", time.perf_counter() - start)
+                    return self._unauthorized(e.detail)
+                # Optional-auth routes: let the service decide how to treat the token
+                payload = None
             
-            if not auth_header or not auth_header.startswith("Bearer "):
-                return JSONResponse(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    content={"detail": "Not authenticated"},
-                    headers={
-                        "WWW-Authenticate": "Bearer",
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Credentials": "true"
-                    }
+            outcome = "verified" if payload else "invalid"
+            if payload:
+                request.state.wallet = payload.get("wallet")
+                request.state.internal_identity = sign_identity(
+                    payload,
+                    auth_guard.settings.INTERNAL_IDENTITY_SECRET,
+                    auth_guard.settings.INTERNAL_IDENTITY_TTL_SECONDS
                 )
-            
-            # Token validation is done at the service level
-            # Gateway just checks presence and format
+        
+        observe_auth(outcome, time.perf_counter() - start)
+        response = await call_next(request)
+        return response
+
+
+class RateLimitMiddleware(BaseHTTPMiddleware):
+    """
+    Per-route rate limits shared by all gateway replicas through Redis.
+    Registered before AuthMiddleware so it runs after it and can key
+    authenticated traffic by verified wallet instead of client IP.
+    """
+    
+    @staticmethod
+    def match_rule(path: str) -> tuple:
+        prefix = max(
+            (route for route in RATE_LIMITS if route != "*" and path.startswith(route)),
+            key=len,
+            default="*"
+        )
+        return prefix, RATE_LIMITS.get(prefix)
+    
+    async def dispatch(self, request: Request, call_next):
+        path = request.url.path
+        
+        if not RATE_LIMIT_ENABLED or request.method == "OPTIONS" or path.startswith(("/health", "/metrics")):
+            return await call_next(request)
+        
+        prefix, rate = self.match_rule(path)
+        if not rate:
+            return await call_next(request)
+        
+        wallet = getattr(request.state, "wallet", None)
+        identity = f"wallet:{wallet.lower()}" if wallet else f"ip:{client_ip(request, TRUST_FORWARDED)}"
+        result = await rate_limiter.hit(f"{prefix}:{identity}", rate)
+        headers = rate_limit_headers(result)
+        
+        if not result.allowed:
+            return JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": f"Rate limit exceeded: {rate}"},
+                headers={
+                    **headers,
+                    "Access-Control-Allow-Origin": "*",
+                    "Access-Control-Allow-Credentials": "true"
+                }
+            )
         
         response = await call_next(request)
+        response.headers.update(headers)
         return response
 
 
+app.add_middleware(RateLimitMiddleware)
+
 # Add auth middleware
 app.add_middleware(AuthMiddleware)
 
 
+class LoadSheddingMiddleware(BaseHTTPMiddleware):
+    """
+    Adaptive load shedding. Registered last so it runs first and rejects
+    excess traffic before any auth or proxy work is done.
+    Money-moving routes get priority over anonymous browsing.
+    """
+    
+    async def dispatch(self, request: Request, call_next):
+        path = request.url.path
+        
+        # Batch sub-requests are admitted individually
+        if (
+            not LOAD_SHEDDING_ENABLED
+            or request.method == "OPTIONS"
+            or path.startswith(("/health", "/metrics"))
+            or path == "/batch"
+        ):
+            return await call_next(request)
+        
+        route_class = classify_request(request.method, path, "authorization" in request.headers)
+        if not await load_shedder.acquire(route_class):
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "Gateway overloaded, please retry"},
+                headers={
+                    "Retry-After": "1",
+                    "Access-Control-Allow-Origin": "*",
+                    "Access-Control-Allow-Credentials": "true"
+                }
+            )
+        
+        start = time.perf_counter()
+        dropped = True
+        try:
+            response = await call_next(request)
+            # Upstream timeouts/unavailability are congestion signals too
+            dropped = response.status_code in (
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                status.HTTP_504_GATEWAY_TIMEOUT
+            )
+            return response
+        finally:
+            await load_shedder.release(route_class, (time.perf_counter() - start) * 1000, dropped)
+
+
+app.add_middleware(LoadSheddingMiddleware)
+
+# Request deadline; time spent queued for admission counts against it
+app.add_middleware(
+    DeadlineMiddleware,
+    default_timeout=REQUEST_TIMEOUT,
+    max_timeout=REQUEST_TIMEOUT,
+    response_headers={
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Allow-Credentials": "true"
+    },
+    observer=observe_deadline_expired
+)
+
+# Prometheus request metrics; wraps every middleware registered above
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Server span per request, continued by every service downstream
+app.add_middleware(TracingMiddleware, tracer=tracer, continue_trace=False)
+
+
 @app.on_event("startup")
 async def startup():
+    if GATEWAY_VERIFY_JWT and not auth_guard.settings.INTERNAL_IDENTITY_SECRET:
+        logger.error("❌ INTERNAL_IDENTITY_SECRET is not set!")
+        raise ValueError("INTERNAL_IDENTITY_SECRET must be set when GATEWAY_VERIFY_JWT is enabled")
+    
+    await tracer.start()
+    await upstreams.start()
+    await health_prober.start()
+    try:
+        await response_cache.connect()
+    except Exception as e:
+        logger.warning(f"⚠️  Response cache disabled - Redis unavailable: {e}")
+    if RATE_LIMIT_ENABLED:
+        await rate_limiter.connect()
     logger.info("✅ API Gateway started")
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    await health_prober.stop()
+    await upstreams.close()
+    await response_cache.close()
+    await rate_limiter.close()
+    await tracer.shutdown()
+    logger.info("👋 API Gateway stopped")
+
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    services_health = {}
-    
-    # Check User Service
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{USER_SERVICE_URL}/health", timeout=2.0)
-            services_health["user_service"] = "healthy" if response.status_code == 200 else "unhealthy"
-    except Exception:
-        services_health["user_service"] = "unreachable"
-    
-    # Check Job Service
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{JOB_SERVICE_URL}/health", timeout=2.0)
-            services_health["job_service"] = "healthy" if response.status_code == 200 else "unhealthy"
-    except Exception:
-        services_health["job_service"] = "unreachable"
-    
-    # Check Payment Service
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{PAYMENT_SERVICE_URL}/health", timeout=2.0)
-            services_health["payment_service"] = "healthy" if response.status_code == 200 else "unhealthy"
-    except Exception:
-        services_health["payment_service"] = "unreachable"
+    """Health check endpoint (serves the background prober's latest snapshot)"""
+    snapshot = health_prober.snapshot()
     
     return {
         "status": "healthy",
         "service": "api-gateway",
-        "services": services_health
+        "services": {
+            f"{name}_service": result["status"]
+            for name, result in snapshot.items()
+        },
+        "details": snapshot
     }
 
 
-async def proxy_request(request: Request, target_url: str):
-    """Proxy request to target service"""
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics in text exposition format"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics disabled")
+    return Response(content=generate_latest(registry), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+
+@app.get("/health/pools")
+async def pool_stats():
+    """Upstream connection pool occupancy (for pool sizing)"""
+    return upstreams.pool_stats()
+
+
+@app.get("/health/circuits")
+async def circuit_stats():
+    """Circuit breaker state and bulkhead occupancy per upstream"""
+    return upstream_guards.get_stats()
+
+
+@app.get("/health/load")
+async def load_stats():
+    """Adaptive concurrency limits and in-flight requests per route class"""
+    return load_shedder.get_stats()
+
+
+@app.get("/health/rate-limits")
+async def rate_limit_stats():
+    """Rate limiter backend (redis or local fallback) and decision counts"""
+    return {"rules": RATE_LIMITS, **rate_limiter.get_stats()}
+
+
+@app.get("/health/deadlines")
+async def deadline_stats():
+    """Requests that ran out of time budget, per stage (arrival, in_flight, outbound)"""
+    return {"request_timeout": REQUEST_TIMEOUT, **get_deadline_stats()}
+
+
+@app.get("/health/coalescing")
+async def coalescing_stats():
+    """Single-flight stats: upstream calls made vs requests merged into them, per route"""
+    return single_flight.get_stats()
+
+
+def filter_hop_by_hop(headers, drop: tuple = ()) -> dict:
+    """Strip hop-by-hop headers, including any listed in the Connection header"""
+    connection_tokens = {
+        token.strip().lower()
+        for token in headers.get("connection", "").split(",")
+        if token.strip()
+    }
+    excluded = HOP_BY_HOP_HEADERS | connection_tokens | set(drop)
+    return {
+        key: value
+        for key, value in headers.items()
+        if key.lower() not in excluded
+    }
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak If-None-Match comparison (compressed responses carry W/ ETags)"""
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def upstream_rejected(e: UpstreamUnavailable) -> HTTPException:
+    """Fast 503 for calls rejected by a circuit breaker or bulkhead"""
+    logger.warning(f"Upstream call rejected: {e}")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=f"Service unavailable ({e.reason})",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+
+def upstream_headers(request: Request, drop: tuple = ()) -> dict:
+    """
+    Headers forwarded upstream: hop-by-hop and host stripped, client-supplied
+    identity and deadline headers discarded and replaced by the gateway's own
+    (the deadline is set per call by the upstream clients), client address
+    appended to X-Forwarded-For.
+    """
+    headers = filter_hop_by_hop(
+        request.headers,
+        drop=("host", INTERNAL_IDENTITY_HEADER.lower(), DEADLINE_HEADER.lower()) + drop
+    )
+    internal_identity = getattr(request.state, "internal_identity", None)
+    if internal_identity:
+        headers[INTERNAL_IDENTITY_HEADER] = internal_identity
+    
+    # Services key per-client rate limits on the last entry: the trusted
+    # proxy's (already last) or the peer address appended here
+    forwarded = request.headers.get("x-forwarded-for")
+    if request.client and not (TRUST_FORWARDED and forwarded):
+        headers["x-forwarded-for"] = f"{forwarded}, {request.client.host}" if forwarded else request.client.host
+    return headers
+
+
+async def proxy_request(request: Request, upstream: str, path: str):
+    """Proxy request to target service over its pooled client"""
+    if PROXY_MODE == "streaming":
+        return await stream_proxy_request(request, upstream, path)
+    
     try:
         # Get request body
         body = await request.body()
         
         # Prepare headers
-        headers = dict(request.headers)
-        headers.pop("host", None)
+        headers = upstream_headers(request)
         
         # Make request to target service
-        async with httpx.AsyncClient() as client:
+        client = upstreams.get(upstream)
+        async with upstream_guards.guard(upstream, route_template(path)) as call:
             response = await client.request(
                 method=request.method,
-                url=target_url,
+                url=path,
                 headers=headers,
                 content=body,
-                params=request.query_params,
-                timeout=30.0
+                params=request.query_params
             )
-            
-            return JSONResponse(
-                content=response.json() if response.text else {},
+            call.status_code = response.status_code
+        
+        # Body is re-encoded below, so upstream length/encoding no longer apply
+        response_headers = filter_hop_by_hop(
+            response.headers,
+            drop=("content-length", "content-encoding")
+        )
+        
+        if "application/json" not in response.headers.get("content-type", ""):
+            return Response(
+                content=response.content,
                 status_code=response.status_code,
-                headers=dict(response.headers)
+                headers=response_headers
             )
+        
+        return JSONResponse(
+            content=response.json() if response.text else {},
+            status_code=response.status_code,
+            headers=response_headers
+        )
             
+    except UpstreamUnavailable as e:
+        raise upstream_rejected(e)
     except httpx.TimeoutException:
         raise HTTPException(
             status_code=status.HTTP_504_GATEWAY_TIMEOUT,
@@ -191,58 +628,299 @@ async def proxy_request(request: Request, target_url: str):
         )
 
 
+class GuardedBody:
+    """Relays a streamed upstream body, then closes it and exits its upstream guard"""
+    
+    def __init__(self, response: httpx.Response, guard):
+        self.response = response
+        self.guard = guard
+        self.closed = False
+    
+    async def relay(self):
+        try:
+            async for chunk in self.response.aiter_raw():
+                yield chunk
+        except Exception as e:
+            await self.close(e)
+            raise
+        await self.close()
+    
+    async def close(self, error: Optional[BaseException] = None):
+        """Settle once: no error is a success, CancelledError (client gone) is no verdict"""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self.response.aclose()
+        finally:
+            try:
+                if error is None:
+                    await self.guard.__aexit__(None, None, None)
+                else:
+                    await self.guard.__aexit__(type(error), error, error.__traceback__)
+            except BaseException as e:
+                if e is not error:
+                    raise
+
+
+async def stream_proxy_request(request: Request, upstream: str, path: str):
+    """
+    Pass-through proxy: forwards request and response bodies chunk by chunk
+    without buffering or decoding them.
+    """
+    try:
+        headers = upstream_headers(request)
+        
+        # Only attach a body stream when the client actually sent one,
+        # otherwise httpx would add chunked encoding to bodiless GETs
+        has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+        
+        client = upstreams.get(upstream)
+        upstream_request = client.build_request(
+            method=request.method,
+            url=path,
+            headers=headers,
+            content=request.stream() if has_body else None,
+            params=request.query_params
+        )
+        # Held until the body has been relayed: the bulkhead slot stays taken and
+        # a failure mid-body still reaches the circuit breaker
+        guard = upstream_guards.guard(upstream, route_template(path))
+        call = await guard.__aenter__()
+        try:
+            response = await client.send(upstream_request, stream=True)
+        except BaseException as e:
+            if not await guard.__aexit__(type(e), e, e.__traceback__):
+                raise
+        call.status_code = response.status_code
+        body = GuardedBody(response, guard)
+        
+        # Raw (still-encoded) bytes are relayed, so content-length/encoding stay valid.
+        # The background task settles a body the client stopped reading
+        return StreamingResponse(
+            body.relay(),
+            status_code=response.status_code,
+            headers=filter_hop_by_hop(response.headers),
+            background=BackgroundTask(body.close, asyncio.CancelledError())
+        )
+        
+    except UpstreamUnavailable as e:
+        raise upstream_rejected(e)
+    except httpx.TimeoutException:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Service timeout"
+        )
+    except Exception as e:
+        logger.error(f"Streaming proxy request failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service unavailable"
+        )
+
+
+async def fetch_upstream_get(request: Request, upstream: str, path: str, route: str, coalesce: bool) -> httpx.Response:
+    """
+    Buffered upstream GET. With coalesce, concurrent identical requests (same
+    path, query and credentials) share one in-flight call.
+    """
+    async def fetch():
+        async with upstream_guards.guard(upstream, route_template(path)) as call:
+            response = await upstreams.get(upstream).request(
+                method="GET",
+                url=path,
+                headers=upstream_headers(request, drop=("if-none-match",)),
+                params=request.query_params
+            )
+            call.status_code = response.status_code
+            return response
+    
+    async def fetch_shared():
+        # Shared between callers with different budgets: bounded by UPSTREAM_TIMEOUT,
+        # while each caller's own deadline still bounds its wait for the result
+        clear_deadline()
+        return await fetch()
+    
+    try:
+        if not coalesce:
+            return await fetch()
+        
+        authorization = request.headers.get("authorization", "")
+        key = "|".join([
+            upstream,
+            path,
+            response_cache.normalize_query(request.query_params.multi_items()),
+            hashlib.sha256(authorization.encode()).hexdigest() if authorization else "anonymous",
+        ])
+        return await single_flight.do(key, route, fetch_shared)
+    
+    except UpstreamUnavailable as e:
+        raise upstream_rejected(e)
+    except httpx.TimeoutException:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Service timeout"
+        )
+    except Exception as e:
+        logger.error(f"Proxy request failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service unavailable"
+        )
+
+
+async def cached_proxy_request(request: Request, upstream: str, path: str, route: str, namespace: str, ttl: int):
+    """
+    Proxy a public GET through the shared response cache.
+    Anonymous requests are served from Redis when fresh; ETag/If-None-Match
+    is honoured on both hits and misses. Cache misses, and requests on routes
+    opted into coalescing, share upstream fetches through single-flight;
+    anything else is proxied normally.
+    """
+    if request.method != "GET":
+        return await proxy_request(request, upstream, path)
+    
+    use_cache = response_cache.redis_client is not None and "authorization" not in request.headers
+    coalesce = use_cache or route in COALESCE_ROUTES
+    if not coalesce:
+        return await proxy_request(request, upstream, path)
+    
+    field = response_cache.field(request.method, path, request.query_params.multi_items())
+    if_none_match = request.headers.get("if-none-match")
+    
+    if use_cache:
+        cached = await response_cache.get(namespace, field)
+        if cached:
+            max_age = max(int(cached.expires_at - time.time()), 0)
+            cache_headers = {
+                "ETag": cached.etag,
+                "Cache-Control": f"public, max-age={max_age}",
+                "X-Cache": "HIT",
+            }
+            if etag_matches(if_none_match, cached.etag):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+            return Response(
+                content=cached.body,
+                status_code=cached.status_code,
+                media_type=cached.content_type,
+                headers=cache_headers
+            )
+    
+    response = await fetch_upstream_get(request, upstream, path, route, coalesce)
+    
+    response_headers = filter_hop_by_hop(
+        response.headers,
+        drop=("content-length", "content-encoding")
+    )
+    if not use_cache or response.status_code != status.HTTP_200_OK:
+        return Response(
+            content=response.content,
+            status_code=response.status_code,
+            headers=response_headers
+        )
+    
+    etag = await response_cache.set(
+        namespace,
+        field,
+        status_code=response.status_code,
+        content_type=response.headers.get("content-type", "application/json"),
+        body=response.content,
+        ttl=ttl
+    )
+    response_headers.update({
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={ttl}",
+        "X-Cache": "MISS",
+    })
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=response_headers)
+    return Response(
+        content=response.content,
+        status_code=response.status_code,
+        headers=response_headers
+    )
+
+
+@app.post("/batch")
+async def batch(request: Request, batch_request: BatchRequest):
+    """
+    Run several sub-requests concurrently and return all results in one response.
+    Each sub-request goes through the gateway as if sent on its own (same
+    credentials, auth checks and rate limits) and keeps its own status code.
+    """
+    if not batch_request.requests:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Batch must contain at least one request"
+        )
+    if len(batch_request.requests) > BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch is limited to {BATCH_MAX_REQUESTS} requests"
+        )
+    
+    responses = await asyncio.gather(*(
+        dispatch_subrequest(app, request.scope, item)
+        for item in batch_request.requests
+    ))
+    return {"responses": responses}
+
+
 # Auth routes → User Service
 @app.api_route("/auth/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def auth_proxy(request: Request, path: str):
-    target_url = f"{USER_SERVICE_URL}/auth/{path}"
-    return await proxy_request(request, target_url)
+    return await proxy_request(request, "user", f"/auth/{path}")
 
 
 # User routes → User Service
 @app.api_route("/users/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def users_proxy(request: Request, path: str):
-    target_url = f"{USER_SERVICE_URL}/users/{path}"
-    return await proxy_request(request, target_url)
+    # Service-to-service only (job service profile lookups), never exposed publicly
+    if path.strip("/") == "batch":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return await proxy_request(request, "user", f"/users/{path}")
 
 
 # Job routes → Job Service
 @app.api_route("/jobs/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def jobs_proxy(request: Request, path: str):
-    target_url = f"{JOB_SERVICE_URL}/jobs/{path}"
-    return await proxy_request(request, target_url)
+    if path.isdigit():
+        return await cached_proxy_request(
+            request, "job", f"/jobs/{path}",
+            route="/jobs/{job_id}", namespace=f"jobs:{path}", ttl=CACHE_TTL_JOB_DETAIL
+        )
+    return await proxy_request(request, "job", f"/jobs/{path}")
 
 
 @app.api_route("/jobs", methods=["GET", "POST"])
 async def jobs_root_proxy(request: Request):
-    target_url = f"{JOB_SERVICE_URL}/jobs"
-    return await proxy_request(request, target_url)
+    return await cached_proxy_request(
+        request, "job", "/jobs",
+        route="/jobs", namespace="jobs:list", ttl=CACHE_TTL_JOBS_LIST
+    )
 
 
 # Payment routes → Payment Service
 @app.api_route("/escrow/{path:path}", methods=["GET", "POST"])
 async def escrow_proxy(request: Request, path: str):
-    target_url = f"{PAYMENT_SERVICE_URL}/escrow/{path}"
-    return await proxy_request(request, target_url)
+    return await proxy_request(request, "payment", f"/escrow/{path}")
 
 
 @app.api_route("/balance/{wallet_address}", methods=["GET"])
 async def balance_proxy(request: Request, wallet_address: str):
-    target_url = f"{PAYMENT_SERVICE_URL}/balance/{wallet_address}"
-    return await proxy_request(request, target_url)
+    return await proxy_request(request, "payment", f"/balance/{wallet_address}")
 
 
 @app.api_route("/payment/balance/{wallet_address}", methods=["GET"])
 async def payment_balance_proxy(request: Request, wallet_address: str):
     """Alternative route for balance (for frontend compatibility)"""
-    target_url = f"{PAYMENT_SERVICE_URL}/balance/{wallet_address}"
-    return await proxy_request(request, target_url)
+    return await proxy_request(request, "payment", f"/balance/{wallet_address}")
 
 
 @app.api_route("/payment/escrow/{path:path}", methods=["GET", "POST"])
 async def payment_escrow_proxy(request: Request, path: str):
     """Alternative route for escrow operations (for frontend compatibility)"""
-    target_url = f"{PAYMENT_SERVICE_URL}/escrow/{path}"
-    return await proxy_request(request, target_url)
+    return await proxy_request(request, "payment", f"/escrow/{path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,187 @@
+"""
+Prometheus metrics for the API Gateway.
+
+- gateway_request_duration_seconds: end-to-end time in the gateway per route template
+- gateway_upstream_duration_seconds: time waiting on each upstream per route template
+- gateway_auth_duration_seconds: time spent in AuthMiddleware
+- gateway_deadline_expired_total: requests that ran out of time budget, per stage
+- status, timeout and byte counters
+
+Paths are collapsed to route templates (/jobs/{id}, /balance/{wallet}) and the
+number of distinct templates is capped, so label cardinality stays bounded.
+"""
+
+import re
+import time
+from typing import Optional, Set
+
+import httpx
+from prometheus_client import CollectorRegistry, Counter, Histogram, disable_created_metrics
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from resilience import UpstreamUnavailable
+from shared.deadline import DeadlineExceeded, expired
+
+# *_created series only add scrape size here
+disable_created_metrics()
+
+registry = CollectorRegistry()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUEST_DURATION = Histogram(
+    "gateway_request_duration_seconds",
+    "Time from request received to response sent, per route template",
+    ["route", "method"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+REQUESTS = Counter(
+    "gateway_requests_total",
+    "Requests handled by the gateway",
+    ["route", "method", "status"],
+    registry=registry,
+)
+REQUEST_BYTES = Counter(
+    "gateway_request_bytes_total",
+    "Request body bytes received from clients",
+    ["route"],
+    registry=registry,
+)
+RESPONSE_BYTES = Counter(
+    "gateway_response_bytes_total",
+    "Response body bytes sent to clients (after compression)",
+    ["route"],
+    registry=registry,
+)
+UPSTREAM_DURATION = Histogram(
+    "gateway_upstream_duration_seconds",
+    "Time waiting on an upstream (until response headers in streaming mode)",
+    ["upstream", "route"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+UPSTREAM_REQUESTS = Counter(
+    "gateway_upstream_requests_total",
+    "Upstream calls by outcome (status code, timeout, rejected or error)",
+    ["upstream", "route", "status"],
+    registry=registry,
+)
+UPSTREAM_TIMEOUTS = Counter(
+    "gateway_upstream_timeouts_total",
+    "Upstream calls that timed out",
+    ["upstream", "route"],
+    registry=registry,
+)
+DEADLINE_EXPIRED = Counter(
+    "gateway_deadline_expired_total",
+    "Requests whose time budget ran out (arrival: already expired, in_flight: cancelled)",
+    ["route", "stage"],
+    registry=registry,
+)
+AUTH_DURATION = Histogram(
+    "gateway_auth_duration_seconds",
+    "Time spent authenticating a request in the gateway",
+    ["outcome"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+    registry=registry,
+)
+
+DYNAMIC_SEGMENTS = [
+    (re.compile(r"/0x[0-9a-fA-F]{40}(?=/|$)"), "/{wallet}"),
+    (re.compile(r"/\d+(?=/|$)"), "/{id}"),
+]
+
+MAX_ROUTE_TEMPLATES = 200
+_route_templates: Set[str] = set()
+
+
+def route_template(path: str) -> str:
+    """Collapse IDs and wallet addresses in a path: /jobs/42/accept -> /jobs/{id}/accept"""
+    for pattern, replacement in DYNAMIC_SEGMENTS:
+        path = pattern.sub(replacement, path)
+    path = path.rstrip("/") or "/"
+
+    if path not in _route_templates:
+        if len(_route_templates) >= MAX_ROUTE_TEMPLATES:
+            return "other"
+        _route_templates.add(path)
+    return path
+
+
+def observe_upstream(upstream: str, route: str, seconds: float, status_code: Optional[int], error: Optional[BaseException]):
+    """Record one upstream call (UpstreamGuards observer)"""
+    # Calls cut short by the request's own budget are not upstream timeouts
+    if isinstance(error, DeadlineExceeded) or (isinstance(error, httpx.TimeoutException) and expired()):
+        outcome = "deadline"
+    elif isinstance(error, httpx.TimeoutException):
+        outcome = "timeout"
+        UPSTREAM_TIMEOUTS.labels(upstream, route).inc()
+    elif isinstance(error, UpstreamUnavailable):
+        outcome = "rejected"
+    elif error is not None:
+        outcome = "error"
+    else:
+        outcome = str(status_code)
+
+    UPSTREAM_REQUESTS.labels(upstream, route, outcome).inc()
+    if outcome not in ("rejected", "deadline"):
+        UPSTREAM_DURATION.labels(upstream, route).observe(seconds)
+
+
+def observe_deadline_expired(stage: str, path: str):
+    """Record a request that ran out of time budget (DeadlineMiddleware observer)"""
+    DEADLINE_EXPIRED.labels(route_template(path), stage).inc()
+
+
+def observe_auth(outcome: str, seconds: float):
+    AUTH_DURATION.labels(outcome).observe(seconds)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording duration, status and body sizes of every request.
+    Registered outermost so the measurement covers all gateway work.
+    """
+
+    def __init__(self, app: ASGIApp, excluded_paths: tuple = ("/metrics",)):
+        self.app = app
+        self.excluded_paths = excluded_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.excluded_paths):
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        bytes_in = 0
+        bytes_out = 0
+
+        async def receive_wrapper() -> Message:
+            nonlocal bytes_in
+            message = await receive()
+            if message["type"] == "http.request":
+                bytes_in += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, bytes_out
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                bytes_out += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            method = scope["method"]
+            # The router sets 'endpoint' on match; unknown paths would otherwise add one template each
+            unmatched = "endpoint" not in scope and status_code == 404
+            route = "unmatched" if unmatched else route_template(scope["path"])
+            REQUEST_DURATION.labels(route, method).observe(time.perf_counter() - start)
+            REQUESTS.labels(route, method, str(status_code)).inc()
+            if bytes_in:
+                REQUEST_BYTES.labels(route).inc(bytes_in)
+            RESPONSE_BYTES.labels(route).inc(bytes_out)
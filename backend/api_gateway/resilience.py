@@ -0,0 +1,279 @@
+"""
+Per-upstream circuit breakers and bulkheads for the API Gateway.
+
+- CircuitBreaker: opens after consecutive failures (errors, 5xx or slow calls)
+  or while background health probes fail, fails fast while open, and lets a
+  limited number of probe calls through when half-open.
+- Bulkhead: caps concurrent in-flight calls per upstream so one slow service
+  cannot take all gateway capacity from the others.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Optional
+import logging
+
+from shared.deadline import DeadlineExceeded, expired
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamUnavailable(Exception):
+    """Raised when a call is rejected without reaching the upstream"""
+
+    def __init__(self, upstream: str, reason: str, retry_after: int = 1):
+        super().__init__(f"{upstream}: {reason}")
+        self.upstream = upstream
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        slow_call_ms: float = 10000,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_ms = slow_call_ms
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self.rejected = 0
+        # Opened by failing health checks rather than by failed calls
+        self.opened_by_health = False
+
+    def allow_request(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.recovery_timeout:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self.half_open_calls = 0
+            logger.info(f"Circuit for '{self.name}' half-open, probing")
+
+        if self.state == self.HALF_OPEN:
+            if self.half_open_calls >= self.half_open_max_calls:
+                self.rejected += 1
+                return False
+            self.half_open_calls += 1
+
+        return True
+
+    def retry_after(self) -> int:
+        remaining = self.recovery_timeout - (time.monotonic() - self.opened_at)
+        return max(int(remaining), 1)
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info(f"✅ Circuit for '{self.name}' closed")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+
+    def abandon(self):
+        """A call finished without an outcome; free its half-open probe slot"""
+        if self.state == self.HALF_OPEN and self.half_open_calls > 0:
+            self.half_open_calls -= 1
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"⚠️  Circuit for '{self.name}' opened after {self.consecutive_failures} failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self.opened_by_health = False
+
+    def trip(self, reason: str):
+        """Open now (or stay open), e.g. while the upstream fails its health checks"""
+        if self.state != self.OPEN:
+            logger.warning(f"⚠️  Circuit for '{self.name}' opened: {reason}")
+            self.opened_by_health = True
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+
+    def health_recovered(self):
+        """
+        A health check passed: a circuit opened by health checks lets real calls
+        probe now instead of after recovery_timeout (one opened by failed calls
+        waits, since /health passing says little about the failing routes)
+        """
+        if self.state == self.OPEN and self.opened_by_health:
+            self.state = self.HALF_OPEN
+            self.half_open_calls = 0
+            logger.info(f"Circuit for '{self.name}' half-open after passing a health check")
+
+    def get_stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "rejected": self.rejected,
+        }
+
+
+class Bulkhead:
+    def __init__(self, name: str, max_concurrent: int = 50, max_wait: float = 0.5):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def acquire(self) -> bool:
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def get_stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrent": self.max_concurrent,
+            "rejected": self.rejected,
+        }
+
+
+class GuardedCall:
+    """Handle yielded by UpstreamGuards.guard(); set status_code once the upstream answers"""
+
+    def __init__(self):
+        self.status_code: Optional[int] = None
+
+
+class UpstreamGuards:
+    """One circuit breaker and one bulkhead per upstream"""
+
+    def __init__(
+        self,
+        upstream_names,
+        bulkhead_limits: Optional[Dict[str, int]] = None,
+        default_max_concurrent: int = 50,
+        max_wait: float = 0.5,
+        failure_threshold: int = 5,
+        slow_call_ms: float = 10000,
+        recovery_timeout: float = 30.0,
+        observer: Optional[Callable] = None
+    ):
+        bulkhead_limits = bulkhead_limits or {}
+        # Called as observer(upstream, route, seconds, status_code, error) after every call
+        self.observer = observer
+        self.breakers = {
+            name: CircuitBreaker(
+                name,
+                failure_threshold=failure_threshold,
+                slow_call_ms=slow_call_ms,
+                recovery_timeout=recovery_timeout
+            )
+            for name in upstream_names
+        }
+        self.bulkheads = {
+            name: Bulkhead(name, bulkhead_limits.get(name, default_max_concurrent), max_wait)
+            for name in upstream_names
+        }
+
+    def record_health(self, upstream: str, healthy: bool):
+        """Health prober verdict: fail fast while unhealthy, probe again once healthy"""
+        breaker = self.breakers.get(upstream)
+        if not breaker:
+            return
+        if healthy:
+            breaker.health_recovered()
+        else:
+            breaker.trip("failing health checks")
+
+    @asynccontextmanager
+    async def guard(self, upstream: str, route: str = ""):
+        """
+        Admit a call through the upstream's circuit breaker and bulkhead.
+        Transport errors, 5xx responses and calls slower than slow_call_ms
+        count as failures.
+        """
+        breaker = self.breakers[upstream]
+        bulkhead = self.bulkheads[upstream]
+
+        try:
+            if not await bulkhead.acquire():
+                raise UpstreamUnavailable(upstream, "too many concurrent requests")
+
+            if not breaker.allow_request():
+                bulkhead.release()
+                raise UpstreamUnavailable(upstream, "circuit open", breaker.retry_after())
+        except UpstreamUnavailable as e:
+            self._observe(upstream, route, 0.0, None, e)
+            raise
+
+        call = GuardedCall()
+        start = time.perf_counter()
+        error = None
+        try:
+            yield call
+        except asyncio.CancelledError:
+            # Client went away: no verdict on the upstream
+            breaker.abandon()
+            raise
+        except Exception as e:
+            error = e
+            # Out of request budget says nothing about the upstream (and a client
+            # asking for a tiny budget must not be able to open the circuit)
+            if isinstance(e, DeadlineExceeded) or expired():
+                breaker.abandon()
+            else:
+                breaker.record_failure()
+            raise
+        else:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if (call.status_code or 0) >= 500 or elapsed_ms > breaker.slow_call_ms:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        finally:
+            bulkhead.release()
+            if call.status_code is not None or error is not None:
+                self._observe(upstream, route, time.perf_counter() - start, call.status_code, error)
+
+    def _observe(self, upstream: str, route: str, seconds: float, status_code: Optional[int], error: Optional[BaseException]):
+        if self.observer:
+            try:
+                self.observer(upstream, route, seconds, status_code, error)
+            except Exception as e:
+                logger.error(f"Upstream observer failed: {e}")
+
+    def get_stats(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "circuit": self.breakers[name].get_stats(),
+                "bulkhead": self.bulkheads[name].get_stats(),
+            }
+            for name in self.breakers
+        }
+
+
+def parse_limits(value: str, cast=int) -> dict:
+    """Parse 'user=50,job=100,payment=20' into a dict"""
+    limits = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, limit = item.split("=", 1)
+            limits[name.strip()] = cast(limit)
+    return limits
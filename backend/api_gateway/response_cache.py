@@ -0,0 +1,174 @@
+"""
+Shared Redis-backed response cache for public GET routes of the API Gateway.
+
+Each entry is its own Redis key (namespace + hash of method, path and
+normalized query) with its own TTL, so entries for rarely repeated queries
+simply expire. Namespaces ("jobs:list", "jobs:<id>") carry a version counter
+that every entry records when written; a job change event bumps the counters
+of the affected namespaces, and entries written under an older version are
+treated as misses until they expire.
+"""
+
+import redis.asyncio as redis
+import asyncio
+import hashlib
+import json
+import time
+from typing import Iterable, Optional, Tuple
+import logging
+
+from shared.job_events import JOB_EVENTS_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse:
+    def __init__(self, status_code: int, content_type: str, etag: str, body: bytes, expires_at: float):
+        self.status_code = status_code
+        self.content_type = content_type
+        self.etag = etag
+        self.body = body
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """Redis response cache with ETag support and job-event invalidation"""
+
+    KEY_PREFIX = "gwcache:"
+    VERSION_PREFIX = "gwcache:version:"
+    # Version counters outlive any entry TTL, so a counter never resets while
+    # entries written under it are still alive
+    VERSION_TTL = 86400
+
+    def __init__(self, redis_url: str, enabled: bool = True):
+        self.redis_url = redis_url
+        self.enabled = enabled
+        self.redis_client: Optional[redis.Redis] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        """Initialize Redis connection and start listening for job change events"""
+        if not self.enabled or self.redis_client:
+            return
+        self.redis_client = await redis.from_url(self.redis_url, socket_connect_timeout=1)
+        self._listener = asyncio.create_task(self._listen_for_invalidations())
+        logger.info("✅ Response cache connected to Redis")
+
+    async def close(self):
+        """Stop the invalidation listener and close Redis connection"""
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        if self.redis_client:
+            await self.redis_client.close()
+            logger.info("👋 Response cache disconnected")
+
+    @staticmethod
+    def make_etag(body: bytes) -> str:
+        return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+    @staticmethod
+    def normalize_query(params: Iterable[Tuple[str, str]]) -> str:
+        """Sort query params and drop blank values so equivalent URLs share an entry"""
+        return "&".join(
+            f"{key}={value}"
+            for key, value in sorted(params)
+            if value != ""
+        )
+
+    def field(self, method: str, path: str, params: Iterable[Tuple[str, str]]) -> str:
+        """Cache field keyed by method, path and normalized query params"""
+        return f"{method} {path}?{self.normalize_query(params)}"
+
+    def _key(self, namespace: str, field: str) -> str:
+        digest = hashlib.sha256(field.encode()).hexdigest()[:32]
+        return f"{self.KEY_PREFIX}{namespace}:{digest}"
+
+    def _version_key(self, namespace: str) -> str:
+        return f"{self.VERSION_PREFIX}{namespace}"
+
+    async def get(self, namespace: str, field: str) -> Optional[CachedResponse]:
+        """Return a fresh cached entry, or None on miss/expiry/Redis failure"""
+        if not self.redis_client:
+            return None
+        try:
+            version, raw = await self.redis_client.mget(
+                self._version_key(namespace), self._key(namespace, field)
+            )
+            if not raw:
+                return None
+
+            meta, body = raw.split(b"\n", 1)
+            meta = json.loads(meta)
+            # Invalidated since it was written, or past its TTL
+            if meta["version"] != int(version or 0) or meta["expires_at"] < time.time():
+                return None
+
+            return CachedResponse(
+                status_code=meta["status_code"],
+                content_type=meta["content_type"],
+                etag=meta["etag"],
+                body=body,
+                expires_at=meta["expires_at"]
+            )
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+
+    async def set(self, namespace: str, field: str, status_code: int, content_type: str, body: bytes, ttl: int) -> str:
+        """Store a response and return its ETag"""
+        etag = self.make_etag(body)
+        if not self.redis_client:
+            return etag
+        try:
+            version = await self.redis_client.get(self._version_key(namespace))
+            meta = json.dumps({
+                "status_code": status_code,
+                "content_type": content_type,
+                "etag": etag,
+                "expires_at": time.time() + ttl,
+                "version": int(version or 0),
+            }).encode()
+
+            await self.redis_client.set(self._key(namespace, field), meta + b"\n" + body, ex=ttl)
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+        return etag
+
+    async def invalidate_job(self, job_id: Optional[int]):
+        """Drop all list pages and the detail entry for a changed job"""
+        if not self.redis_client:
+            return
+        namespaces = ["jobs:list"]
+        if job_id is not None:
+            namespaces.append(f"jobs:{job_id}")
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for namespace in namespaces:
+                    pipe.incr(self._version_key(namespace))
+                    pipe.expire(self._version_key(namespace), self.VERSION_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Response cache invalidation failed: {e}")
+
+    async def _listen_for_invalidations(self):
+        """Consume job change events from the job service, reconnecting on errors"""
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(JOB_EVENTS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    event = json.loads(message["data"])
+                    await self.invalidate_job(event.get("job_id"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Job event subscription lost, retrying: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
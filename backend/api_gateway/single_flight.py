@@ -0,0 +1,51 @@
+"""
+Request coalescing (single-flight) for the API Gateway.
+Concurrent identical upstream GETs share one in-flight call and all
+receive its result.
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share the same key"""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"upstream_calls": 0, "merged": 0})
+
+    async def do(self, key: str, route: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once per key; callers arriving while it is in flight await the same result.
+        The call runs in its own task, so a disconnecting first caller does not
+        cancel it for everyone else.
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self._stats[route]["merged"] += 1
+        else:
+            self._stats[route]["upstream_calls"] += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t, key=key: self._finish(key, t))
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> dict:
+        """Per-route upstream call and merged request counts"""
+        return {
+            "in_flight": len(self._calls),
+            "routes": {route: dict(counts) for route, counts in self._stats.items()},
+        }
@@ -0,0 +1,111 @@
+"""
+Pooled upstream HTTP clients for the API Gateway.
+One long-lived httpx.AsyncClient per backend service, created at startup
+and closed at shutdown, so proxied requests reuse keep-alive connections.
+"""
+
+import httpx
+import logging
+from typing import Callable, Dict, List, Optional
+
+from shared.tracing import Tracer, TracingTransport
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamClients:
+    """Registry of pooled httpx clients keyed by upstream name (user, job, payment)"""
+
+    def __init__(
+        self,
+        base_urls: Dict[str, str],
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        timeout: float = 30.0,
+        tracer: Optional[Tracer] = None,
+        event_hooks: Optional[Dict[str, List[Callable]]] = None
+    ):
+        self.base_urls = base_urls
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http2 = http2
+        self.timeout = timeout
+        self.tracer = tracer
+        self.event_hooks = event_hooks
+        self.clients: Dict[str, httpx.AsyncClient] = {}
+
+    async def start(self):
+        """Create one pooled client per upstream"""
+        if self.http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("⚠️  HTTP/2 requested but 'h2' is not installed - falling back to HTTP/1.1")
+                self.http2 = False
+
+        for name, base_url in self.base_urls.items():
+            # With a tracer, requests carry the trace context and get client spans
+            transport = (
+                TracingTransport(self.tracer, limits=self.limits, http2=self.http2)
+                if self.tracer else None
+            )
+            self.clients[name] = httpx.AsyncClient(
+                base_url=base_url,
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                transport=transport,
+                event_hooks=self.event_hooks
+            )
+
+        logger.info(
+            f"✅ Upstream pools ready: {', '.join(self.clients)} "
+            f"(max_connections={self.limits.max_connections}, http2={self.http2})"
+        )
+
+    async def close(self):
+        """Close all pooled clients and their connections"""
+        for client in self.clients.values():
+            await client.aclose()
+        self.clients.clear()
+        logger.info("👋 Upstream pools closed")
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Get the pooled client for an upstream"""
+        client = self.clients.get(name)
+        if client is None:
+            raise RuntimeError(f"Upstream client '{name}' is not initialized")
+        return client
+
+    def pool_stats(self) -> Dict[str, dict]:
+        """
+        Report connection pool occupancy per upstream.
+        Reads httpcore pool internals, so values are best-effort.
+        """
+        stats = {}
+        for name, client in self.clients.items():
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            connections = list(getattr(pool, "connections", []) or [])
+            idle = sum(1 for conn in connections if conn.is_idle())
+            closed = sum(1 for conn in connections if conn.is_closed())
+            requests = list(getattr(pool, "_requests", []) or [])
+            queued = sum(1 for req in requests if getattr(req, "is_queued", lambda: False)())
+
+            stats[name] = {
+                "base_url": self.base_urls[name],
+                "connections": len(connections),
+                "active": len(connections) - idle - closed,
+                "idle": idle,
+                "in_flight": len(requests),
+                "queued": queued,
+                "max_connections": self.limits.max_connections,
+                "max_keepalive_connections": self.limits.max_keepalive_connections,
+                "http2": self.http2,
+            }
+        return stats
+
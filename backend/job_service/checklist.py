@@ -0,0 +1,109 @@
+"""
+Checklist item toggles.
+set_item_completed() flips one item's "completed" flag with jsonb_set inside a
+single UPDATE and returns the changed item and the new progress, all computed
+by Postgres, so the job row is neither loaded nor rewritten from Python. The
+UPDATE only matches while the caller is the assigned worker of an in-progress
+job that has the item; otherwise one SELECT explains the failure.
+"""
+
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, select, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Job
+from shared.schemas import JobStatus
+
+# Item IDs are compared as text (item->>'id') so a malformed item cannot break the cast
+TOGGLE_ITEM = text("""
+    UPDATE jobs
+    SET checklist = jsonb_set(
+        checklist,
+        ARRAY[(
+            SELECT (items.ord - 1)::text
+            FROM jsonb_array_elements(jobs.checklist) WITH ORDINALITY AS items(item, ord)
+            WHERE items.item->>'id' = :item_id
+            LIMIT 1
+        ), 'completed'],
+        to_jsonb(CAST(:completed AS boolean))
+    )
+    WHERE id = :job_id
+      AND worker_id = :worker_id
+      AND status = :status
+      AND EXISTS (
+          SELECT 1 FROM jsonb_array_elements(jobs.checklist) AS items(item)
+          WHERE items.item->>'id' = :item_id
+      )
+    RETURNING
+        employer_id,
+        (
+            SELECT items.item FROM jsonb_array_elements(jobs.checklist) AS items(item)
+            WHERE items.item->>'id' = :item_id
+            LIMIT 1
+        ) AS item,
+        (
+            SELECT count(*) FILTER (WHERE (items.item->>'completed')::boolean)
+            FROM jsonb_array_elements(jobs.checklist) AS items(item)
+        ) AS completed_count,
+        jsonb_array_length(checklist) AS total
+""").columns(employer_id=Integer, item=JSONB, completed_count=Integer, total=Integer)
+
+HAS_ITEM = text(
+    "EXISTS (SELECT 1 FROM jsonb_array_elements(jobs.checklist) AS items(item) "
+    "WHERE items.item->>'id' = :item_id)"
+)
+
+
+async def set_item_completed(
+    session: AsyncSession,
+    job_id: int,
+    worker_id: int,
+    item_id: int,
+    completed: bool
+) -> dict:
+    """
+    Mark a checklist item completed or not (not committed).
+    Returns {"employer_id", "item", "completed_count", "total", "progress_percent"}.
+    """
+    result = await session.execute(TOGGLE_ITEM, {
+        "job_id": job_id,
+        "worker_id": worker_id,
+        "status": JobStatus.IN_PROGRESS.value,
+        "item_id": str(item_id),
+        "completed": completed,
+    })
+    row = result.mappings().first()
+    if row is None:
+        await _raise_failure(session, job_id, worker_id, item_id)
+
+    total = row["total"]
+    return {
+        **row,
+        "progress_percent": row["completed_count"] * 100 // total if total > 0 else 0,
+    }
+
+
+async def _raise_failure(session: AsyncSession, job_id: int, worker_id: int, item_id: int):
+    result = await session.execute(
+        select(Job.worker_id, Job.status, HAS_ITEM.bindparams(item_id=str(item_id)))
+        .where(Job.id == job_id)
+    )
+    row = result.first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    assigned_worker, job_status, has_item = row
+    if assigned_worker != worker_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not assigned to this job")
+    if job_status != JobStatus.IN_PROGRESS.value:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Cannot update the checklist of a job that is {job_status}"
+        )
+    if not has_item:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Checklist item {item_id} not found"
+        )
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Job changed while updating its checklist, please retry")
@@ -0,0 +1,140 @@
+"""
+Total counts for job listings.
+COUNT(*) over the listing filters is often the most expensive statement on
+the browse page, so GET /jobs picks a strategy per request:
+  exact    - COUNT(*) every time
+  cached   - exact count cached in Redis for a short TTL, keyed by a hash of the filters
+  estimate - the planner's row estimate (EXPLAIN); small results are counted
+             (cached) instead, where the estimate is least reliable and counting is cheap
+  none     - no count at all, the page reports has_more instead
+"""
+
+import hashlib
+import json
+import logging
+from typing import Optional, Tuple
+
+import redis.asyncio as redis
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+logger = logging.getLogger(__name__)
+
+COUNT_STRATEGIES = ("exact", "cached", "estimate", "none")
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <statement>, keeping the statement's bound parameters"""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+class JobCounter:
+    """Counts jobs matching a listing's filters using the requested strategy"""
+
+    def __init__(self, redis_url: str, ttl: int = 30, estimate_min_rows: int = 10000):
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.estimate_min_rows = estimate_min_rows
+        self.redis_client: Optional[redis.Redis] = None
+        self._stats = {"exact": 0, "cache_hits": 0, "cache_misses": 0, "estimates": 0, "redis_errors": 0}
+
+    async def connect(self):
+        """Connect to Redis"""
+        if not self.redis_client:
+            self.redis_client = await redis.from_url(
+                self.redis_url,
+                decode_responses=True,
+                socket_connect_timeout=1,
+                socket_timeout=0.2
+            )
+            logger.info("✅ Job count cache connected to Redis")
+
+    async def close(self):
+        """Close Redis connection"""
+        if self.redis_client:
+            await self.redis_client.close()
+            logger.info("👋 Job count cache disconnected")
+
+    @staticmethod
+    def cache_key(filters: dict) -> str:
+        raw = json.dumps(filters, sort_keys=True, default=str)
+        return "job_count:" + hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+    async def count(
+        self,
+        session: AsyncSession,
+        count_query,
+        rows_query,
+        filters: dict,
+        strategy: str
+    ) -> Tuple[Optional[int], bool]:
+        """
+        Return (total, is_estimate) for a listing.
+        count_query is the filtered SELECT count(...), rows_query the filtered
+        SELECT without ORDER BY/LIMIT that EXPLAIN estimates.
+        """
+        if strategy == "none":
+            return None, False
+        if strategy == "exact":
+            return await self._exact(session, count_query), False
+        if strategy == "estimate":
+            estimate = await self._estimate(session, rows_query)
+            if estimate is not None and estimate >= self.estimate_min_rows:
+                self._stats["estimates"] += 1
+                return estimate, True
+        return await self._cached(session, count_query, filters), False
+
+    async def _exact(self, session: AsyncSession, count_query) -> int:
+        self._stats["exact"] += 1
+        result = await session.execute(count_query)
+        return result.scalar()
+
+    async def _cached(self, session: AsyncSession, count_query, filters: dict) -> int:
+        key = self.cache_key(filters)
+        if self.redis_client:
+            try:
+                cached = await self.redis_client.get(key)
+                if cached is not None:
+                    self._stats["cache_hits"] += 1
+                    return int(cached)
+            except Exception as e:
+                self._stats["redis_errors"] += 1
+                logger.debug(f"Job count cache read failed: {e}")
+
+        self._stats["cache_misses"] += 1
+        total = await self._exact(session, count_query)
+        if self.redis_client:
+            try:
+                await self.redis_client.set(key, total, ex=self.ttl)
+            except Exception as e:
+                self._stats["redis_errors"] += 1
+                logger.debug(f"Job count cache write failed: {e}")
+        return total
+
+    async def _estimate(self, session: AsyncSession, rows_query) -> Optional[int]:
+        """Planner row estimate for the query (None where EXPLAIN isn't supported)"""
+        # get_bind() also resolves the engine of a replica-routed read session
+        if session.get_bind().dialect.name != "postgresql":
+            return None
+        result = await session.execute(Explain(rows_query))
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def get_stats(self) -> dict:
+        return {
+            "ttl": self.ttl,
+            "estimate_min_rows": self.estimate_min_rows,
+            **self._stats,
+        }
@@ -0,0 +1,241 @@
+"""
+Transactional outbox for escrow locks.
+create_job commits the job and an escrow_outbox row together and returns with
+payment_status=pending; EscrowOutboxWorker then locks the funds through the
+payment service and records the outcome on the job. Rows are claimed with a
+lease (UPDATE ... FOR UPDATE SKIP LOCKED), so every job service replica can
+drain the same outbox, and rows held by a crashed worker are retried once the
+lease runs out. Retrying is safe: the payment service treats the job ID as the
+idempotency key and reports an escrow that already exists.
+"""
+
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, List, Optional
+
+import httpx
+from sqlalchemy import select, update
+
+from models import EscrowOutbox, Job
+from shared.database import Database
+from shared.schemas import PaymentStatus
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying; any other 4xx means the lock request itself is bad
+RETRYABLE_STATUS = {408, 425, 429}
+
+
+class PermanentLockFailure(Exception):
+    pass
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class EscrowOutboxWorker:
+    """Drains escrow_outbox into POST /escrow/lock with retries"""
+
+    def __init__(
+        self,
+        database: Database,
+        client_factory: Callable[[], httpx.AsyncClient],
+        payment_service_url: str,
+        api_key: Optional[str],
+        on_settled: Callable[[int, Optional[int], str], Awaitable[None]],
+        batch_size: int = 10,
+        poll_interval: float = 1.0,
+        request_timeout: float = 150.0,
+        max_attempts: int = 5,
+        retry_base_delay: float = 2.0,
+        retry_max_delay: float = 300.0
+    ):
+        self.database = database
+        self.client_factory = client_factory
+        self.payment_service_url = payment_service_url
+        self.api_key = api_key
+        # Called with (job_id, employer_id, payment_status) once a lock is locked or failed
+        self.on_settled = on_settled
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.request_timeout = request_timeout
+        # A claimed row stays hidden from other workers this long
+        self.lease = request_timeout + 30
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"claimed": 0, "locked": 0, "retried": 0, "failed": 0}
+
+    async def start(self):
+        """Start draining the outbox in the background"""
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+            logger.info("✅ Escrow outbox worker started")
+
+    async def stop(self):
+        """Stop the worker; locks in flight are retried after their lease"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("👋 Escrow outbox worker stopped")
+
+    def wake(self):
+        """Check the outbox now instead of at the next poll (call after committing a row)"""
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                # Keep going while full batches suggest a backlog
+                while await self.drain() == self.batch_size:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Escrow outbox drain failed: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def drain(self) -> int:
+        """Claim one batch of due rows and process them concurrently"""
+        entries = await self._claim()
+        if entries:
+            self._stats["claimed"] += len(entries)
+            await asyncio.gather(*(self._process(entry) for entry in entries))
+        return len(entries)
+
+    async def _claim(self) -> List[EscrowOutbox]:
+        now = _now()
+        due = (
+            select(EscrowOutbox.id)
+            .where(EscrowOutbox.status == "pending", EscrowOutbox.next_attempt_at <= now)
+            .order_by(EscrowOutbox.next_attempt_at, EscrowOutbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with self.database.async_session() as session:
+            result = await session.execute(
+                update(EscrowOutbox)
+                .where(EscrowOutbox.id.in_(due))
+                .values(
+                    attempts=EscrowOutbox.attempts + 1,
+                    next_attempt_at=now + timedelta(seconds=self.lease)
+                )
+                .returning(EscrowOutbox)
+                .execution_options(synchronize_session=False)
+            )
+            entries = list(result.scalars().all())
+            await session.commit()
+        return entries
+
+    async def _process(self, entry: EscrowOutbox):
+        try:
+            try:
+                result = await self._send_lock(entry)
+            except PermanentLockFailure as e:
+                await self._settle(entry, PaymentStatus.FAILED.value, error=str(e))
+                return
+            except Exception as e:
+                if entry.attempts >= self.max_attempts:
+                    await self._settle(entry, PaymentStatus.FAILED.value, error=str(e) or type(e).__name__)
+                else:
+                    await self._retry(entry, str(e) or type(e).__name__)
+                return
+            await self._settle(entry, PaymentStatus.LOCKED.value, result=result)
+        except Exception as e:
+            # Bookkeeping failed: the row is retried when its lease expires
+            logger.error(f"Escrow outbox row {entry.id} (job {entry.job_id}) not recorded: {e}")
+
+    async def _send_lock(self, entry: EscrowOutbox) -> dict:
+        async with self.client_factory() as client:
+            response = await client.post(
+                f"{self.payment_service_url}/escrow/lock",
+                json={"job_id": entry.job_id, **entry.payload},
+                headers={"X-Service-API-Key": self.api_key},
+                timeout=self.request_timeout
+            )
+
+        if response.status_code == 200:
+            result = response.json()
+            if result.get("status") in ("confirmed", "already_locked"):
+                return result
+            raise RuntimeError(f"Lock transaction {result.get('status')}")
+        if 400 <= response.status_code < 500 and response.status_code not in RETRYABLE_STATUS:
+            raise PermanentLockFailure(f"{response.status_code}: {response.text[:200]}")
+        raise RuntimeError(f"Payment service returned {response.status_code}")
+
+    async def _retry(self, entry: EscrowOutbox, error: str):
+        delay = min(self.retry_base_delay * 2 ** (entry.attempts - 1), self.retry_max_delay)
+        delay *= random.uniform(0.8, 1.2)
+        async with self.database.async_session() as session:
+            await session.execute(
+                update(EscrowOutbox)
+                .where(EscrowOutbox.id == entry.id, EscrowOutbox.status == "pending")
+                .values(next_attempt_at=_now() + timedelta(seconds=delay), last_error=error)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        self._stats["retried"] += 1
+        logger.warning(
+            f"⚠️  Escrow lock for job {entry.job_id} failed "
+            f"(attempt {entry.attempts}/{self.max_attempts}), retrying in {delay:.0f}s: {error}"
+        )
+
+    async def _settle(self, entry: EscrowOutbox, payment_status: str, result: Optional[dict] = None, error: Optional[str] = None):
+        """Finish the row and the job's payment status in one transaction"""
+        job_values = {"payment_status": payment_status}
+        if result is not None:
+            job_values["contract_address"] = result.get("contract_address")
+            job_values["contract_job_id"] = entry.job_id  # Blockchain uses same ID as database
+
+        async with self.database.async_session() as session:
+            finished = await session.execute(
+                update(EscrowOutbox)
+                .where(EscrowOutbox.id == entry.id, EscrowOutbox.status == "pending")
+                .values(status="done" if result is not None else "failed", last_error=error)
+                .execution_options(synchronize_session=False)
+            )
+            if finished.rowcount == 0:
+                # Another worker settled it after our lease ran out
+                await session.rollback()
+                return
+            job = await session.execute(
+                update(Job)
+                .where(Job.id == entry.job_id)
+                .values(**job_values)
+                .returning(Job.employer_id)
+                .execution_options(synchronize_session=False)
+            )
+            employer_id = job.scalar_one_or_none()
+            await session.commit()
+
+        if result is not None:
+            self._stats["locked"] += 1
+            logger.info(f"Funds locked for job {entry.job_id}: {result.get('transaction_hash')}")
+        else:
+            self._stats["failed"] += 1
+            logger.error(f"❌ Escrow lock for job {entry.job_id} failed after {entry.attempts} attempt(s): {error}")
+
+        try:
+            await self.on_settled(entry.job_id, employer_id, payment_status)
+        except Exception as e:
+            logger.warning(f"Escrow settlement notification failed for job {entry.job_id}: {e}")
+
+    def get_stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "max_attempts": self.max_attempts,
+            **self._stats,
+        }
@@ -0,0 +1,209 @@
+"""
+Background refunds for expired jobs.
+Every interval, ExpiredJobSweeper claims a batch of in-progress jobs whose
+deadline has passed and whose funds are still locked (idx_jobs_deadline) by
+moving them to 'expired' in one short UPDATE ... FOR UPDATE SKIP LOCKED
+transaction, the same lease pattern as the escrow outbox. The refunds then run
+through the payment service with bounded concurrency outside any transaction,
+and each job is settled in its own short conditional UPDATE, so no row lock or
+pool connection is held across the HTTP calls. A job whose refund fails goes
+back to in_progress and is retried on the next sweep; one left 'expired' by a
+crashed worker is claimed again once its lease (updated_at) runs out. Refunds
+are idempotent in the payment service, so a retried claim is safe.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, Optional
+
+import httpx
+from sqlalchemy import and_, func, or_, select, update
+
+from models import Job
+from shared.database import Database
+from shared.schemas import JobStatus, PaymentStatus
+
+logger = logging.getLogger(__name__)
+
+
+class ExpiredJobSweeper:
+    """Periodically refunds expired in-progress jobs"""
+
+    def __init__(
+        self,
+        database: Database,
+        client_factory: Callable[[], httpx.AsyncClient],
+        payment_service_url: str,
+        api_key: Optional[str],
+        on_refunded: Callable[[Job], Awaitable[None]],
+        interval: float = 60.0,
+        batch_size: int = 20,
+        concurrency: int = 4,
+        request_timeout: float = 150.0
+    ):
+        self.database = database
+        self.client_factory = client_factory
+        self.payment_service_url = payment_service_url
+        self.api_key = api_key
+        # Called for each refunded job after its status is committed
+        self.on_refunded = on_refunded
+        self.interval = interval
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.request_timeout = request_timeout
+        # A claimed job stays 'expired' (hidden from other sweepers) this long
+        self.lease = request_timeout + 30
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"sweeps": 0, "claimed": 0, "refunded": 0, "failed": 0, "last_sweep": None}
+
+    async def start(self):
+        """Start sweeping in the background"""
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"✅ Expired job sweeper started (every {self.interval:.0f}s)")
+
+    async def stop(self):
+        """Stop sweeping; jobs of an unfinished batch are claimed again once their lease runs out"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("👋 Expired job sweeper stopped")
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Expired job sweep failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def sweep(self) -> int:
+        """Refund expired jobs batch by batch; returns how many were refunded"""
+        self._stats["sweeps"] += 1
+        self._stats["last_sweep"] = datetime.utcnow().isoformat()
+        refunded = 0
+        failed = set()  # retried next sweep, not in the next batch
+        while True:
+            claimed, batch_refunded = await self._sweep_batch(failed)
+            refunded += batch_refunded
+            # A short batch means nothing else is due (or the rest is held by other replicas)
+            if claimed < self.batch_size:
+                return refunded
+
+    async def _sweep_batch(self, failed: set):
+        """Claim, refund and settle one batch; adds jobs whose refund failed to failed"""
+        jobs = await self._claim(failed)
+        if not jobs:
+            return 0, 0
+        self._stats["claimed"] += len(jobs)
+
+        limit = asyncio.Semaphore(self.concurrency)
+
+        async def process(job: Job) -> bool:
+            async with limit:
+                refunded = await self._refund(job)
+            try:
+                return await self._settle(job, refunded)
+            except Exception as e:
+                # Left 'expired': claimed again when the lease runs out
+                logger.error(f"Expired job {job.id} refund not recorded: {e}")
+                return False
+
+        outcomes = await asyncio.gather(*(process(job) for job in jobs))
+        refunded = [job for job, ok in zip(jobs, outcomes) if ok]
+        failed.update(job.id for job, ok in zip(jobs, outcomes) if not ok)
+
+        self._stats["refunded"] += len(refunded)
+        self._stats["failed"] += len(jobs) - len(refunded)
+        for job in refunded:
+            logger.info(f"Job {job.id} refunded due to expiration")
+            try:
+                await self.on_refunded(job)
+            except Exception as e:
+                logger.warning(f"Refund notification failed for job {job.id}: {e}")
+        return len(jobs), len(refunded)
+
+    async def _claim(self, failed: set) -> List[Job]:
+        """Move due jobs (and ones whose lease ran out) to 'expired' and commit"""
+        due = (
+            select(Job.id)
+            .where(
+                or_(
+                    and_(Job.status == JobStatus.IN_PROGRESS.value, Job.deadline < datetime.utcnow()),
+                    and_(
+                        Job.status == JobStatus.EXPIRED.value,
+                        Job.updated_at < func.now() - timedelta(seconds=self.lease)
+                    )
+                ),
+                Job.payment_status == PaymentStatus.LOCKED.value
+            )
+            .order_by(Job.deadline)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        if failed:
+            due = due.where(Job.id.notin_(failed))
+        async with self.database.async_session() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.id.in_(due))
+                .values(status=JobStatus.EXPIRED.value)
+                .returning(Job)
+                .execution_options(synchronize_session=False)
+            )
+            jobs = list(result.scalars().all())
+            await session.commit()
+        return jobs
+
+    async def _settle(self, job: Job, refunded: bool) -> bool:
+        """Record the refund (or hand the job back to in_progress) if the claim is still ours"""
+        values = (
+            {"status": JobStatus.CANCELLED.value, "payment_status": PaymentStatus.REFUNDED.value}
+            if refunded else {"status": JobStatus.IN_PROGRESS.value}
+        )
+        async with self.database.async_session() as session:
+            result = await session.execute(
+                update(Job)
+                .where(
+                    Job.id == job.id,
+                    Job.status == JobStatus.EXPIRED.value,
+                    Job.payment_status == PaymentStatus.LOCKED.value
+                )
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+        # rowcount 0: another sweeper settled it after our lease ran out
+        return refunded and result.rowcount == 1
+
+    async def _refund(self, job: Job) -> bool:
+        try:
+            async with self.client_factory() as client:
+                response = await client.post(
+                    f"{self.payment_service_url}/escrow/refund",
+                    json={"job_id": job.contract_job_id or job.id},
+                    headers={"X-Service-API-Key": self.api_key},
+                    timeout=self.request_timeout
+                )
+            if response.status_code == 200 and response.json().get("status") in ("confirmed", "already_refunded"):
+                return True
+            logger.error(f"❌ Refund for expired job {job.id} failed: {response.status_code} - {response.text[:200]}")
+        except Exception as e:
+            logger.error(f"❌ Refund for expired job {job.id} failed: {e}")
+        return False
+
+    def get_stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "interval": self.interval,
+            "batch_size": self.batch_size,
+            "concurrency": self.concurrency,
+            **self._stats,
+        }
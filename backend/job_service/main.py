@@ -2,9 +2,9 @@ from fastapi import FastAPI, Depends, HTTPException, status, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func
-from sqlalchemy.orm import attributes
-from datetime import datetime, timedelta
-from typing import Optional, List
+from datetime import datetime
+from typing import Dict, Optional, List
+import asyncio
 import httpx
 import logging
 import time
@@ -20,9 +20,22 @@ from shared.schemas import (
     ChecklistUpdateRequest,
     JobUpdate,
     PaginatedJobsResponse,
+    USER_BATCH_MAX_IDS,
 )
 from shared.auth_guard import get_current_user, require_employer, require_worker, get_current_user_optional
-from models import Job
+from shared.job_events import get_job_event_publisher
+from shared.tracing import TracingMiddleware, get_tracer
+from shared.deadline import DEADLINE_HOOKS, DeadlineMiddleware
+from shared.deadline import get_stats as get_deadline_stats
+from models import EscrowOutbox, Job, users
+from user_cache import UserProfileCache
+from pagination import InvalidCursor, apply_cursor, apply_order, encode_cursor
+from search import relevance, search_condition
+from counts import COUNT_STRATEGIES, JobCounter
+from escrow_outbox import EscrowOutboxWorker
+from expiry_sweeper import ExpiredJobSweeper
+from checklist import set_item_completed
+from state_machine import RESET_CHECKLIST, TransitionConflict, TransitionForbidden, transition
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,7 +43,32 @@ logger = logging.getLogger(__name__)
 app = FastAPI(title="PayChain Job Service", version="1.0.0")
 
 settings = get_settings()
-db = get_database(settings.DATABASE_URL)
+db = get_database(
+    settings.DATABASE_URL,
+    settings.DATABASE_REPLICA_URLS,
+    max_replica_lag=settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+    read_your_writes_window=settings.DATABASE_READ_YOUR_WRITES_SECONDS,
+    write_marker_url=settings.REDIS_URL
+)
+job_events = get_job_event_publisher(settings.REDIS_URL)
+tracer = get_tracer("job-service")
+
+# Join usernames in SQL (same database) instead of calling the user service
+USERNAMES_VIA_JOIN = settings.JOB_USERNAME_LOOKUP.lower() == "join"
+
+# Public user profiles, invalidated by the user service's user_events
+user_cache = UserProfileCache(
+    settings.REDIS_URL,
+    max_size=settings.JOB_USER_CACHE_SIZE,
+    ttl=settings.JOB_USER_CACHE_TTL_SECONDS
+)
+
+# Total counts for GET /jobs (strategy per request, see counts.py)
+job_counter = JobCounter(
+    settings.REDIS_URL,
+    ttl=settings.JOB_COUNT_CACHE_TTL_SECONDS,
+    estimate_min_rows=settings.JOB_COUNT_ESTIMATE_MIN_ROWS
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -40,6 +78,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Remaining time budget from X-Request-Timeout-Ms (set by the gateway)
+app.add_middleware(DeadlineMiddleware)
+
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
 
 # Security headers middleware
 @app.middleware("http")
@@ -71,12 +114,32 @@ async def startup():
     if len(settings.JWT_SECRET_KEY) < 32:
         logger.warning("⚠️  JWT_SECRET_KEY is too short (minimum 32 characters recommended)")
     
+    await job_events.connect()
+    try:
+        await user_cache.connect()
+    except Exception as e:
+        logger.warning(f"⚠️  User cache invalidation disabled - Redis unavailable: {e}")
+    try:
+        await job_counter.connect()
+    except Exception as e:
+        logger.warning(f"⚠️  Job count cache disabled - Redis unavailable: {e}")
+    await db.start()
+    await escrow_worker.start()
+    if settings.JOB_EXPIRY_SWEEP_ENABLED:
+        await expiry_sweeper.start()
+    await tracer.start()
     logger.info("✅ Job Service started with security enhancements")
 
 
 @app.on_event("shutdown")
 async def shutdown():
+    await escrow_worker.stop()
+    await expiry_sweeper.stop()
+    await job_events.close()
+    await user_cache.close()
+    await job_counter.close()
     await db.close()
+    await tracer.shutdown()
     logger.info("👋 Job Service stopped")
 
 
@@ -85,11 +148,23 @@ async def get_db_session():
         yield session
 
 
+# Read-only handlers: replica when configured (see shared.database)
+async def get_read_session():
+    async for session in db.get_read_session():
+        yield session
+
+
+def service_client() -> httpx.AsyncClient:
+    """Client for calls to other services: traced, timeouts bounded by the request deadline"""
+    return tracer.async_client(event_hooks=DEADLINE_HOOKS)
+
+
 # Helper function for WebSocket calls with API key
+# (no deadline: notifications follow a write that has already been committed)
 async def ws_broadcast(message_type: str, data: dict, channel: str = None):
     """Send broadcast message to WebSocket server with API key"""
     try:
-        async with httpx.AsyncClient() as client:
+        async with tracer.async_client() as client:
             await client.post(
                 f"{settings.WS_SERVICE_URL}/broadcast",
                 json={"type": message_type, "data": data, "channel": channel},
@@ -103,7 +178,7 @@ async def ws_broadcast(message_type: str, data: dict, channel: str = None):
 async def ws_notify(user_id: int, message_type: str, data: dict):
     """Send notification to specific user via WebSocket with API key"""
     try:
-        async with httpx.AsyncClient() as client:
+        async with tracer.async_client() as client:
             await client.post(
                 f"{settings.WS_SERVICE_URL}/notify",
                 json={"user_id": user_id, "type": message_type, "data": data},
@@ -114,98 +189,202 @@ async def ws_notify(user_id: int, message_type: str, data: dict):
         logger.warning(f"WebSocket notify failed: {e}")
 
 
+async def escrow_settled(job_id: int, employer_id: Optional[int], payment_status: str):
+    """Announce the outcome of an outbox escrow lock"""
+    await job_events.publish("job_updated", job_id)
+    if employer_id is not None:
+        await ws_notify(employer_id, "job_payment_status", {
+            "job_id": job_id,
+            "payment_status": payment_status
+        })
+
+
+# Escrow locks for new jobs (written to escrow_outbox by create_job)
+escrow_worker = EscrowOutboxWorker(
+    db,
+    service_client,
+    settings.PAYMENT_SERVICE_URL,
+    settings.PAYMENT_SERVICE_API_KEY,
+    on_settled=escrow_settled,
+    batch_size=settings.JOB_ESCROW_OUTBOX_BATCH_SIZE,
+    poll_interval=settings.JOB_ESCROW_OUTBOX_POLL_SECONDS,
+    request_timeout=settings.JOB_ESCROW_LOCK_TIMEOUT_SECONDS,
+    max_attempts=settings.JOB_ESCROW_LOCK_MAX_ATTEMPTS
+)
+
+
+async def expired_job_refunded(job: Job):
+    """Announce a refund made by the expiry sweeper"""
+    await job_events.publish("job_refunded", job.id)
+    await ws_broadcast("job_refunded", {"job_id": job.id, "reason": "expired"})
+
+
+# Refunds expired in-progress jobs (safe to run on every replica)
+expiry_sweeper = ExpiredJobSweeper(
+    db,
+    service_client,
+    settings.PAYMENT_SERVICE_URL,
+    settings.PAYMENT_SERVICE_API_KEY,
+    on_refunded=expired_job_refunded,
+    interval=settings.JOB_EXPIRY_SWEEP_INTERVAL_SECONDS,
+    batch_size=settings.JOB_EXPIRY_SWEEP_BATCH_SIZE,
+    concurrency=settings.JOB_EXPIRY_REFUND_CONCURRENCY
+)
+
+
 # Note: get_current_user, require_employer, require_worker now imported from shared.auth_guard
 
 
-async def enrich_job_with_usernames(job: Job) -> JobResponse:
-    """Fetch employer and worker usernames from user service"""
-    job_dict = {
-        "id": job.id,
-        "employer_id": job.employer_id,
-        "worker_id": job.worker_id,
-        "title": job.title,
-        "description": job.description,
-        "job_type": job.job_type,
-        "pay_amount_usd": job.pay_amount_usd,
-        "pay_amount_eth": job.pay_amount_eth,
-        "platform_fee_usd": job.platform_fee_usd,
-        "platform_fee_eth": job.platform_fee_eth,
-        "time_limit_hours": job.time_limit_hours,
-        "accepted_at": job.accepted_at,
-        "deadline": job.deadline,
-        "completed_at": job.completed_at,
-        "checklist": job.checklist,
-        "contract_address": job.contract_address,
-        "status": job.status,
-        "payment_status": job.payment_status,
-        "created_at": job.created_at,
-        "updated_at": job.updated_at,
-        "employer_username": None,
-        "worker_username": None
-    }
-    
-    # Fetch employer username
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{settings.USER_SERVICE_URL}/users/{job.employer_id}",
-                timeout=5.0
-            )
-            if response.status_code == 200:
-                user_data = response.json()
-                job_dict["employer_username"] = user_data.get("username")
-    except Exception as e:
-        logger.warning(f"Failed to fetch employer username: {e}")
+async def fetch_user_profiles(user_ids) -> Dict[int, dict]:
+    """
+    Public profiles for a set of user IDs, from the in-process cache or else
+    via POST /users/batch (one call per 100 IDs), or straight from the users
+    table with JOB_USERNAME_LOOKUP=join.
+    """
+    profiles, ids = user_cache.get_many(sorted({user_id for user_id in user_ids if user_id}))
+    if not ids:
+        return profiles
     
-    # Fetch worker username if assigned
-    if job.worker_id:
+    generation = user_cache.generation
+    fetched = {}
+    if USERNAMES_VIA_JOIN:
+        async with db.async_session() as session:
+            result = await session.execute(select(users).where(users.c.id.in_(ids)))
+            fetched = {row.id: dict(row._mapping) for row in result}
+    else:
+        chunks = [ids[i:i + USER_BATCH_MAX_IDS] for i in range(0, len(ids), USER_BATCH_MAX_IDS)]
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{settings.USER_SERVICE_URL}/users/{job.worker_id}",
-                    timeout=5.0
-                )
+            async with service_client() as client:
+                responses = await asyncio.gather(*(
+                    client.post(
+                        f"{settings.USER_SERVICE_URL}/users/batch",
+                        json={"ids": chunk},
+                        headers={"X-Service-API-Key": settings.JOB_SERVICE_API_KEY or ""},
+                        timeout=5.0
+                    )
+                    for chunk in chunks
+                ))
+            for response in responses:
                 if response.status_code == 200:
-                    user_data = response.json()
-                    job_dict["worker_username"] = user_data.get("username")
+                    fetched.update({user["id"]: user for user in response.json()["users"]})
         except Exception as e:
-            logger.warning(f"Failed to fetch worker username: {e}")
+            logger.warning(f"Failed to fetch user profiles: {e}")
     
-    return JobResponse(**job_dict)
+    user_cache.set_many(fetched, generation)
+    profiles.update(fetched)
+    return profiles
+
+
+def build_job_response(job: Job, employer_username: Optional[str], worker_username: Optional[str]) -> JobResponse:
+    return JobResponse(
+        id=job.id,
+        employer_id=job.employer_id,
+        worker_id=job.worker_id,
+        title=job.title,
+        description=job.description,
+        job_type=job.job_type,
+        pay_amount_usd=job.pay_amount_usd,
+        pay_amount_eth=job.pay_amount_eth,
+        platform_fee_usd=job.platform_fee_usd,
+        platform_fee_eth=job.platform_fee_eth,
+        time_limit_hours=job.time_limit_hours,
+        accepted_at=job.accepted_at,
+        deadline=job.deadline,
+        completed_at=job.completed_at,
+        checklist=job.checklist,
+        contract_address=job.contract_address,
+        status=job.status,
+        payment_status=job.payment_status,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        employer_username=employer_username,
+        worker_username=worker_username
+    )
+
+
+async def enrich_jobs_with_usernames(jobs: List[Job]) -> List[JobResponse]:
+    """Fetch employer and worker usernames for a page of jobs in one lookup"""
+    profiles = await fetch_user_profiles(
+        [job.employer_id for job in jobs] + [job.worker_id for job in jobs]
+    )
+    return [
+        build_job_response(
+            job,
+            (profiles.get(job.employer_id) or {}).get("username"),
+            (profiles.get(job.worker_id) or {}).get("username")
+        )
+        for job in jobs
+    ]
+
+
+async def enrich_job_with_usernames(job: Job) -> JobResponse:
+    """Fetch employer and worker usernames from user service"""
+    return (await enrich_jobs_with_usernames([job]))[0]
+
+
+async def load_jobs_with_usernames(session: AsyncSession, query) -> List[JobResponse]:
+    """
+    Run a select(Job) query and return enriched jobs. With JOB_USERNAME_LOOKUP=join
+    the usernames come from LEFT JOINs on users in the same query.
+    """
+    if not USERNAMES_VIA_JOIN:
+        result = await session.execute(query)
+        return await enrich_jobs_with_usernames(result.scalars().all())
+    
+    employer = users.alias("employer")
+    worker = users.alias("worker")
+    joined = (
+        query
+        .add_columns(employer.c.username, worker.c.username)
+        .outerjoin(employer, employer.c.id == Job.employer_id)
+        .outerjoin(worker, worker.c.id == Job.worker_id)
+    )
+    result = await session.execute(joined)
+    return [
+        build_job_response(job, employer_username, worker_username)
+        for job, employer_username, worker_username in result.all()
+    ]
 
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "job-service"}
+    return {
+        "status": "healthy",
+        "service": "job-service",
+        "deadlines": get_deadline_stats(),
+        "user_cache": user_cache.get_stats(),
+        "job_counts": job_counter.get_stats(),
+        "database": db.get_stats(),
+        "escrow_outbox": escrow_worker.get_stats(),
+        "expiry_sweeper": expiry_sweeper.get_stats()
+    }
 
 
 @app.get("/jobs/expired", response_model=List[JobResponse])
 async def get_expired_jobs(
+    limit: int = 100,
     user: dict = Depends(get_current_user),
     session: AsyncSession = Depends(get_db_session)
 ):
-    """Get expired jobs that need refunds (admin/platform use)"""
+    """
+    Get expired jobs that still need refunds, oldest deadline first (admin/platform use).
+    The expiry sweeper refunds these in the background; this shows its backlog.
+    """
     try:
         current_time = datetime.utcnow()
         
-        # Find jobs that are in_progress and past their deadline
+        # Jobs past their deadline (idx_jobs_deadline), plus ones the sweeper is refunding
         query = select(Job).where(
             and_(
-                Job.status == JobStatus.IN_PROGRESS.value,
-                Job.deadline < current_time,
+                or_(
+                    and_(Job.status == JobStatus.IN_PROGRESS.value, Job.deadline < current_time),
+                    Job.status == JobStatus.EXPIRED.value
+                ),
                 Job.payment_status == PaymentStatus.LOCKED.value
             )
-        )
-        
-        result = await session.execute(query)
-        expired_jobs = result.scalars().all()
-        
-        enriched_jobs = []
-        for job in expired_jobs:
-            enriched = await enrich_job_with_usernames(job)
-            enriched_jobs.append(enriched)
+        ).order_by(Job.deadline).limit(min(max(limit, 1), 500))
         
-        return enriched_jobs
+        return await load_jobs_with_usernames(session, query)
         
     except Exception as e:
         logger.error(f"Get expired jobs failed: {e}")
@@ -223,7 +402,8 @@ async def refund_expired_job(
 ):
     """Refund an expired job (employer can request, or automatic)"""
     try:
-        result = await session.execute(select(Job).where(Job.id == job_id))
+        # Row lock: waits for (rather than races) an expiry sweeper claiming or settling this job
+        result = await session.execute(select(Job).where(Job.id == job_id).with_for_update())
         job = result.scalar_one_or_none()
         
         if not job:
@@ -236,6 +416,13 @@ async def refund_expired_job(
                 detail="Not authorized to refund this job"
             )
         
+        # Claimed by the expiry sweeper: its refund is already under way
+        if job.status == JobStatus.EXPIRED.value:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Refund for this job is already in progress"
+            )
+        
         # Check if job is expired and in progress
         if job.status != JobStatus.IN_PROGRESS.value:
             raise HTTPException(
@@ -257,7 +444,7 @@ async def refund_expired_job(
         
         # Call Payment Service to refund
         try:
-            async with httpx.AsyncClient() as client:
+            async with service_client() as client:
                 response = await client.post(
                     f"{settings.PAYMENT_SERVICE_URL}/escrow/refund",
                     json={"job_id": job.id},
@@ -272,6 +459,8 @@ async def refund_expired_job(
                     
                     logger.info(f"Job {job_id} refunded due to expiration")
                     
+                    await job_events.publish("job_refunded", job.id)
+                    
                     # Broadcast
                     await ws_broadcast("job_refunded", {"job_id": job.id, "reason": "expired"})
                     
@@ -307,7 +496,13 @@ async def create_job(
     user: dict = Depends(get_current_user),
     session: AsyncSession = Depends(get_db_session)
 ):
-    """Create new job (employer only)"""
+    """
+    Create new job (employer only).
+    
+    Returns with payment_status=pending: the escrow lock is queued in the same
+    transaction and sent by the escrow outbox worker, which notifies the
+    employer (job_payment_status) once funds are locked or locking failed.
+    """
     try:
         if user.get("user_type") != "employer":
             raise HTTPException(
@@ -344,35 +539,21 @@ async def create_job(
         )
         
         session.add(new_job)
+        await session.flush()
+        
+        # Queue the escrow lock in the same transaction (see escrow_outbox.py)
+        session.add(EscrowOutbox(
+            job_id=new_job.id,
+            payload={
+                "employer_wallet": user.get("wallet"),
+                "amount_eth": str(pay_amount_eth + platform_fee_eth),
+                "time_limit_hours": job_data.time_limit_hours
+            }
+        ))
         await session.commit()
-        await session.refresh(new_job)
+        escrow_worker.wake()
         
-        # Call Payment Service to lock funds
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{settings.PAYMENT_SERVICE_URL}/escrow/lock",
-                    json={
-                        "job_id": new_job.id,
-                        "employer_wallet": user.get("wallet"),
-                        "amount_eth": str(pay_amount_eth + platform_fee_eth),
-                        "time_limit_hours": job_data.time_limit_hours
-                    },
-                    headers={"X-Service-API-Key": settings.PAYMENT_SERVICE_API_KEY},
-                    timeout=30.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    new_job.contract_address = result.get("contract_address")
-                    new_job.contract_job_id = new_job.id  # Blockchain uses same ID as database
-                    new_job.payment_status = PaymentStatus.LOCKED.value
-                    await session.commit()
-                    logger.info(f"Funds locked for job {new_job.id}: {result.get('transaction_hash')}")
-        except Exception as e:
-            logger.error(f"Failed to lock funds: {e}")
-            new_job.payment_status = PaymentStatus.FAILED.value
-            await session.commit()
+        await job_events.publish("job_created", new_job.id)
         
         # Broadcast to WebSocket
         await ws_broadcast("job_created", {
@@ -451,6 +632,7 @@ async def update_job(
 
         await session.commit()
         await session.refresh(job)
+        await job_events.publish("job_updated", job.id)
 
         return await enrich_job_with_usernames(job)
 
@@ -473,22 +655,23 @@ async def delete_job(
 ):
     """Cancel an open job and refund locked funds (employer only)"""
     try:
-        result = await session.execute(select(Job).where(Job.id == job_id))
-        job = result.scalar_one_or_none()
-
-        if not job:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
-
-        if user.get("user_type") != "employer" or job.employer_id != int(user.get("sub")):
+        if user.get("user_type") != "employer":
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this job")
 
-        if job.status != JobStatus.OPEN.value:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only open jobs can be deleted")
+        # Cancelling first keeps the row locked while the refund runs, so the
+        # job cannot be accepted in the meantime
+        job = await transition(
+            session, job_id, "cancel",
+            guards=[
+                (Job.employer_id == int(user.get("sub")), TransitionForbidden("Not authorized to delete this job")),
+                (Job.payment_status != PaymentStatus.PENDING.value, TransitionConflict("Funds are still being locked, try again shortly")),
+            ]
+        )
 
-        # Refund locked funds before cancelling
+        # Refund locked funds before committing the cancellation
         if job.payment_status == PaymentStatus.LOCKED.value and job.contract_job_id:
             try:
-                async with httpx.AsyncClient() as client:
+                async with service_client() as client:
                     # Use cancel endpoint for employer cancellation (before deadline)
                     response = await client.post(
                         f"{settings.PAYMENT_SERVICE_URL}/escrow/cancel",
@@ -524,8 +707,8 @@ async def delete_job(
                 logger.error(f"Cancel job error for job {job_id}: {refund_error}")
                 # Continue with cancellation even if refund fails
 
-        job.status = JobStatus.CANCELLED.value
         await session.commit()
+        await job_events.publish("job_cancelled", job_id)
 
     except HTTPException:
         raise
@@ -548,11 +731,35 @@ async def list_jobs(
     sort_by: Optional[str] = None,
     skip: int = 0,
     limit: int = 20,
+    pagination: str = "offset",
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    count: Optional[str] = None,
     user: Optional[dict] = Depends(get_current_user_optional),
-    session: AsyncSession = Depends(get_db_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
-    """List jobs with filters, sorting, and pagination metadata (optional auth)"""
+    """
+    List jobs with filters, sorting, and pagination metadata (optional auth).
+    
+    search uses full-text matching with a trigram fallback (see search.py).
+    Offset mode (default) takes skip/limit and returns total/pages.
+    Cursor mode (pagination=cursor, or any cursor) returns next_cursor/has_more
+    and skips the count unless include_total is set; deep pages cost the same
+    as the first.
+    count picks how total is computed: exact, cached (default), estimate, or
+    none (has_more instead of total/pages) - see counts.py.
+    """
+    if count is not None and count not in COUNT_STRATEGIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"count must be one of: {', '.join(COUNT_STRATEGIES)}"
+        )
+    
     try:
+        cursor_mode = pagination == "cursor" or cursor is not None
+        if count is None:
+            count = "none" if cursor_mode and not include_total else settings.JOB_COUNT_STRATEGY
+        
         # Build base query for filtering
         query = select(Job)
         count_query = select(func.count(Job.id))
@@ -566,45 +773,66 @@ async def list_jobs(
             conditions.append(Job.pay_amount_usd >= min_pay)
         if max_pay:
             conditions.append(Job.pay_amount_usd <= max_pay)
+        search = search.strip() if search else None
         if search:
-            conditions.append(
-                or_(
-                    Job.title.ilike(f"%{search}%"),
-                    Job.description.ilike(f"%{search}%")
-                )
-            )
+            conditions.append(search_condition(search))
         
         if conditions:
             query = query.where(and_(*conditions))
             count_query = count_query.where(and_(*conditions))
         
         # Get total count
-        total_result = await session.execute(count_query)
-        total = total_result.scalar()
+        filters = {
+            "status": status_filter,
+            "job_type": job_type,
+            "min_pay": min_pay,
+            "max_pay": max_pay,
+            "search": search
+        }
+        total, total_is_estimate = await job_counter.count(
+            session, count_query, query.with_only_columns(Job.id), filters, count
+        )
         
-        # Apply sorting
-        if sort_by == "pay_high":
-            query = query.order_by(Job.pay_amount_usd.desc())
-        elif sort_by == "pay_low":
-            query = query.order_by(Job.pay_amount_usd.asc())
-        elif sort_by == "oldest":
-            query = query.order_by(Job.created_at.asc())
-        elif sort_by == "title":
-            query = query.order_by(Job.title.asc())
-        else:  # Default to newest
-            query = query.order_by(Job.created_at.desc())
+        # Apply sorting (ties broken on id so pages are stable). Searches are
+        # ranked by relevance unless another sort is asked for (offset mode only)
+        if search and sort_by in (None, "relevance") and not cursor_mode:
+            query = query.order_by(relevance(search).desc(), Job.id.desc())
+        else:
+            query = apply_order(query, sort_by)
+        
+        if cursor_mode:
+            if cursor:
+                query = apply_cursor(query, sort_by, cursor)
+            
+            # One extra row tells whether another page exists
+            enriched_jobs = await load_jobs_with_usernames(session, query.limit(limit + 1))
+            has_more = len(enriched_jobs) > limit
+            enriched_jobs = enriched_jobs[:limit]
+            
+            return PaginatedJobsResponse(
+                jobs=enriched_jobs,
+                total=total,
+                total_is_estimate=total_is_estimate,
+                skip=0,
+                limit=limit,
+                pages=(total + limit - 1) // limit if total is not None and limit > 0 else None,
+                next_cursor=encode_cursor(sort_by, enriched_jobs[-1]) if has_more and enriched_jobs else None,
+                has_more=has_more
+            )
         
-        # Apply pagination
-        query = query.offset(skip).limit(limit)
+        # Apply pagination (without a total, one extra row tells whether more exist)
+        query = query.offset(skip).limit(limit if total is not None else limit + 1)
         
-        result = await session.execute(query)
-        jobs = result.scalars().all()
+        # Enrich with usernames (one lookup or joined query for the whole page)
+        enriched_jobs = await load_jobs_with_usernames(session, query)
         
-        # Enrich with usernames
-        enriched_jobs = []
-        for job in jobs:
-            enriched = await enrich_job_with_usernames(job)
-            enriched_jobs.append(enriched)
+        if total is None:
+            return PaginatedJobsResponse(
+                jobs=enriched_jobs[:limit],
+                skip=skip,
+                limit=limit,
+                has_more=len(enriched_jobs) > limit
+            )
         
         # Calculate total pages
         pages = (total + limit - 1) // limit if limit > 0 else 0
@@ -612,11 +840,17 @@ async def list_jobs(
         return PaginatedJobsResponse(
             jobs=enriched_jobs,
             total=total,
+            total_is_estimate=total_is_estimate,
             skip=skip,
             limit=limit,
             pages=pages
         )
         
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {e}"
+        )
     except Exception as e:
         logger.error(f"List jobs failed: {e}")
         raise HTTPException(
@@ -628,7 +862,7 @@ async def list_jobs(
 @app.get("/jobs/my-jobs", response_model=List[JobResponse])
 async def get_my_jobs(
     user: dict = Depends(get_current_user),
-    session: AsyncSession = Depends(get_db_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get current user's jobs"""
     try:
@@ -641,16 +875,8 @@ async def get_my_jobs(
             query = select(Job).where(Job.worker_id == user_id)
         
         query = query.order_by(Job.created_at.desc())
-        result = await session.execute(query)
-        jobs = result.scalars().all()
-        
         # Enrich with usernames
-        enriched_jobs = []
-        for job in jobs:
-            enriched = await enrich_job_with_usernames(job)
-            enriched_jobs.append(enriched)
-        
-        return enriched_jobs
+        return await load_jobs_with_usernames(session, query)
         
     except Exception as e:
         logger.error(f"Get my jobs failed: {e}")
@@ -664,7 +890,7 @@ async def get_my_jobs(
 async def get_job(
     job_id: int,
     user: Optional[dict] = Depends(get_current_user_optional),
-    session: AsyncSession = Depends(get_db_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get job details (optional auth - some details only visible to authenticated users)"""
     result = await session.execute(select(Job).where(Job.id == job_id))
@@ -686,7 +912,7 @@ async def accept_job(
     user: dict = Depends(get_current_user),
     session: AsyncSession = Depends(get_db_session)
 ):
-    """Worker accepts job"""
+    """Worker accepts job (funds were locked in escrow when the job was created)"""
     try:
         if user.get("user_type") != "worker":
             raise HTTPException(
@@ -694,81 +920,19 @@ async def accept_job(
                 detail="Only workers can accept jobs"
             )
         
-        result = await session.execute(select(Job).where(Job.id == job_id))
-        job = result.scalar_one_or_none()
-        
-        if not job:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
-        
-        if job.status != JobStatus.OPEN.value:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Job not available")
-        
-        # Get employer wallet address from user service
-        employer_wallet = None
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{settings.USER_SERVICE_URL}/users/{job.employer_id}",
-                    timeout=5.0
-                )
-                if response.status_code == 200:
-                    user_data = response.json()
-                    employer_wallet = user_data.get("wallet_address")
-        except Exception as e:
-            logger.error(f"Failed to fetch employer wallet: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to retrieve employer information"
-            )
-        
-        if not employer_wallet:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Employer wallet not found"
-            )
-        
-        # Call Payment Service to lock funds in escrow
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{settings.PAYMENT_SERVICE_URL}/escrow/lock",
-                    json={
-                        "job_id": job.id,
-                        "employer_wallet": employer_wallet,
-                        "amount_eth": str(job.pay_amount_eth),
-                        "time_limit_hours": job.time_limit_hours
-                    },
-                    headers={"X-Service-API-Key": settings.PAYMENT_SERVICE_API_KEY},
-                    timeout=30.0
-                )
-                
-                if response.status_code == 200:
-                    escrow_data = response.json()
-                    job.contract_address = escrow_data.get("contract_address")
-                    job.payment_status = PaymentStatus.LOCKED.value
-                    logger.info(f"Escrow locked for job {job_id}, contract: {job.contract_address}")
-                else:
-                    error_detail = response.json().get("detail", "Unknown error")
-                    logger.error(f"Escrow lock failed: {error_detail}")
-                    raise HTTPException(
-                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                        detail=f"Failed to lock escrow: {error_detail}"
-                    )
-        except httpx.RequestError as e:
-            logger.error(f"Payment service connection error: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Payment service unavailable"
-            )
-        
-        # Update job status
-        job.worker_id = int(user.get("sub"))
-        job.status = JobStatus.IN_PROGRESS.value
-        job.accepted_at = datetime.utcnow()
-        job.deadline = datetime.utcnow() + timedelta(hours=job.time_limit_hours)
-        
+        # One conditional UPDATE: of concurrent accepts only one finds the job open.
+        # The set_job_deadline trigger sets the deadline from accepted_at.
+        job = await transition(
+            session, job_id, "accept",
+            guards=[(
+                Job.payment_status == PaymentStatus.LOCKED.value,
+                TransitionConflict("Job funds are not locked yet")
+            )],
+            values={"worker_id": int(user.get("sub")), "accepted_at": datetime.utcnow()}
+        )
         await session.commit()
         await session.refresh(job)
+        await job_events.publish("job_accepted", job.id)
         
         # Broadcast with worker username
         await ws_broadcast("job_accepted", {
@@ -807,39 +971,23 @@ async def withdraw_from_job(
                 detail="Only workers can withdraw from jobs"
             )
         
-        result = await session.execute(select(Job).where(Job.id == job_id))
-        job = result.scalar_one_or_none()
-        
-        if not job:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
-        
-        if job.worker_id != int(user.get("sub")):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You are not assigned to this job"
-            )
-        
-        if job.status != JobStatus.IN_PROGRESS.value:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Can only withdraw from jobs in progress"
-            )
-        
-        # Reset job to open status
-        job.worker_id = None
-        job.status = JobStatus.OPEN.value
-        job.accepted_at = None
-        job.deadline = None
-        
-        # Reset checklist to uncompleted state
-        if job.checklist:
-            job.checklist = [
-                {**item, "completed": False} for item in job.checklist
-            ]
-            attributes.flag_modified(job, "checklist")
-        
+        # Reopen the job and reset its checklist to uncompleted in one UPDATE
+        job = await transition(
+            session, job_id, "withdraw",
+            guards=[(
+                Job.worker_id == int(user.get("sub")),
+                TransitionForbidden("You are not assigned to this job")
+            )],
+            values={
+                "worker_id": None,
+                "accepted_at": None,
+                "deadline": None,
+                "checklist": RESET_CHECKLIST,
+            }
+        )
         await session.commit()
         await session.refresh(job)
+        await job_events.publish("job_reopened", job.id)
         
         # Notify employer via WebSocket
         await ws_notify(job.employer_id, "job_withdrawn", {
@@ -880,58 +1028,37 @@ async def update_checklist(
 ):
     """Update checklist item"""
     try:
-        result = await session.execute(select(Job).where(Job.id == job_id))
-        job = result.scalar_one_or_none()
-        
-        if not job:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
-        
-        if job.worker_id != int(user.get("sub")):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not assigned to this job")
-        
-        # Update checklist
-        checklist = job.checklist
-        item_found = False
-        for item in checklist:
-            if item["id"] == request.item_id:
-                item["completed"] = request.completed
-                item_found = True
-                break
-        
-        if not item_found:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Checklist item {request.item_id} not found"
-            )
-        
-        # Mark the checklist field as modified so SQLAlchemy knows to update it
-        attributes.flag_modified(job, "checklist")
-        job.checklist = checklist
+        # Toggle the item in Postgres (jsonb_set) and get the new progress back
+        result = await set_item_completed(
+            session, job_id, int(user.get("sub")), request.item_id, request.completed
+        )
         await session.commit()
-        await session.refresh(job)
+        await job_events.publish("checklist_updated", job_id)
         
-        # Calculate progress
-        total = len(checklist)
-        completed_count = sum(1 for item in checklist if item["completed"])
-        progress = int((completed_count / total) * 100) if total > 0 else 0
+        progress = result["progress_percent"]
         
-        # Broadcast WebSocket update to employer for real-time progress monitoring
+        # Broadcast only the changed item; clients patch their cached checklist
         try:
             await ws_broadcast("checklist_updated", {
-                "job_id": job.id,
-                "employer_id": job.employer_id,
-                "worker_id": job.worker_id,
-                "item_id": request.item_id,
-                "completed": request.completed,
+                "job_id": job_id,
+                "employer_id": result["employer_id"],
+                "worker_id": int(user.get("sub")),
+                "item": result["item"],
+                "completed_count": result["completed_count"],
+                "total": result["total"],
                 "progress_percent": progress,
-                "checklist": checklist,
                 "timestamp": int(time.time())
             })
             logger.info(f"Checklist updated for job {job_id}: item {request.item_id} = {request.completed}, progress: {progress}%")
         except Exception as ws_error:
             logger.error(f"WebSocket broadcast failed for checklist update: {ws_error}")
         
-        return {"checklist": checklist, "progress_percent": progress}
+        return {
+            "item": result["item"],
+            "completed_count": result["completed_count"],
+            "total": result["total"],
+            "progress_percent": progress
+        }
         
     except HTTPException:
         raise
@@ -952,32 +1079,28 @@ async def complete_job(
 ):
     """Submit job completion"""
     try:
-        result = await session.execute(select(Job).where(Job.id == job_id))
-        job = result.scalar_one_or_none()
-        
-        if not job:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
-        
-        if job.worker_id != int(user.get("sub")):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not assigned to this job")
+        # The transition holds the row lock while funds are released; it is
+        # rolled back if the checklist is unfinished or the release fails
+        job = await transition(
+            session, job_id, "complete",
+            guards=[
+                (Job.worker_id == int(user.get("sub")), TransitionForbidden("Not assigned to this job")),
+                (Job.contract_address.isnot(None), TransitionConflict("Escrow was not locked for this job")),
+            ],
+            values={"completed_at": datetime.utcnow()}
+        )
         
         # Check if all checklist items are completed
         if not all(item["completed"] for item in job.checklist):
+            await session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="All checklist items must be completed"
             )
         
-        # Verify escrow was locked
-        if not job.contract_address:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Escrow was not locked for this job"
-            )
-        
         # Call Payment Service to release funds
         try:
-            async with httpx.AsyncClient() as client:
+            async with service_client() as client:
                 response = await client.post(
                     f"{settings.PAYMENT_SERVICE_URL}/escrow/release",
                     json={
@@ -987,32 +1110,32 @@ async def complete_job(
                     headers={"X-Service-API-Key": settings.PAYMENT_SERVICE_API_KEY},
                     timeout=30.0
                 )
-                
-                if response.status_code == 200:
-                    job.status = JobStatus.COMPLETED.value
-                    job.payment_status = PaymentStatus.RELEASED.value
-                    job.completed_at = datetime.utcnow()
-                    await session.commit()
-                    
-                    logger.info(f"Job {job_id} completed, payment released")
-                    
-                    # Broadcast
-                    await ws_broadcast("job_completed", {"job_id": job.id, "payment_released": True})
-                    
-                    # Refresh the job object to reattach it to the session
-                    await session.refresh(job)
-                else:
-                    raise HTTPException(
-                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                        detail="Payment service unavailable"
-                    )
         except httpx.RequestError as e:
             logger.error(f"Payment service error: {e}")
+            await session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Payment service unavailable"
+            )
+        
+        if response.status_code != 200:
+            await session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Payment service unavailable"
             )
         
+        job.payment_status = PaymentStatus.RELEASED.value
+        await session.commit()
+        
+        logger.info(f"Job {job_id} completed, payment released")
+        await job_events.publish("job_completed", job.id)
+        
+        # Broadcast
+        await ws_broadcast("job_completed", {"job_id": job.id, "payment_released": True})
+        
+        await session.refresh(job)
+        
         # Enrich with usernames
         return await enrich_job_with_usernames(job)
         
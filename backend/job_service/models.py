@@ -1,4 +1,7 @@
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, Text, Boolean, JSON, Index
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, Text, Boolean, JSON, Index, Table
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from shared.database import Base
 
@@ -38,6 +41,10 @@ class Job(Base):
     status = Column(String(20), nullable=False, default='open', index=True)
     payment_status = Column(String(20), default='pending')
     
+    # Full-text search vector, written by the set_job_search_vector trigger
+    # (deferred: only used in WHERE/ORDER BY, never loaded)
+    search_vector = deferred(Column(TSVECTOR))
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -70,3 +77,35 @@ class Transaction(Base):
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     confirmed_at = Column(DateTime(timezone=True))
+
+
+class EscrowOutbox(Base):
+    """Escrow lock written with its job, delivered by EscrowOutboxWorker"""
+    __tablename__ = "escrow_outbox"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, nullable=False, unique=True)
+    
+    # Lock request for the payment service
+    payload = Column(JSON, nullable=False)
+    
+    # Delivery
+    status = Column(String(20), nullable=False, default='pending')
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    last_error = Column(Text)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# The user service's table, read (never written) by the joined username
+# lookup (JOB_USERNAME_LOOKUP=join); only the public columns are mapped
+users = Table(
+    "users",
+    Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("username", String(50)),
+    Column("wallet_address", String(42)),
+)
@@ -0,0 +1,97 @@
+"""
+Keyset (cursor) pagination for job listings.
+Each sort orders by its column plus Job.id as a tie-breaker, and the next
+page starts strictly after the (value, id) pair of the last row seen, so
+any page costs one index range scan however deep it is.
+Cursors are opaque base64url tokens bound to the sort they were made for.
+"""
+
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Tuple
+
+from sqlalchemy import tuple_
+
+from models import Job
+from shared.schemas import JobResponse
+
+# sort_by -> (column name, descending)
+SORTS = {
+    "newest": ("created_at", True),
+    "oldest": ("created_at", False),
+    "pay_high": ("pay_amount_usd", True),
+    "pay_low": ("pay_amount_usd", False),
+    "title": ("title", False),
+}
+DEFAULT_SORT = "newest"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def normalize_sort(sort_by: str) -> str:
+    return sort_by if sort_by in SORTS else DEFAULT_SORT
+
+
+def apply_order(query, sort_by: str):
+    """ORDER BY the sort column, then id in the same direction"""
+    column_name, descending = SORTS[normalize_sort(sort_by)]
+    column = getattr(Job, column_name)
+    if descending:
+        return query.order_by(column.desc(), Job.id.desc())
+    return query.order_by(column.asc(), Job.id.asc())
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (Decimal, float)):
+        return str(value)
+    return value
+
+
+def _decode_value(column_name: str, value: Any) -> Any:
+    if column_name == "created_at":
+        return datetime.fromisoformat(value)
+    if column_name == "pay_amount_usd":
+        return Decimal(value)
+    if not isinstance(value, str):
+        raise InvalidCursor("bad cursor value")
+    return value
+
+
+def encode_cursor(sort_by: str, job: JobResponse) -> str:
+    """Cursor pointing just past this job in the given sort"""
+    sort_by = normalize_sort(sort_by)
+    column_name, _ = SORTS[sort_by]
+    payload = {"s": sort_by, "v": _encode_value(getattr(job, column_name)), "id": job.id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(sort_by: str, cursor: str) -> Tuple[Any, int]:
+    """Parse a cursor into the (value, id) of the last row seen"""
+    sort_by = normalize_sort(sort_by)
+    column_name, _ = SORTS[sort_by]
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload["s"] != sort_by:
+            raise InvalidCursor("cursor was issued for a different sort")
+        return _decode_value(column_name, payload["v"]), int(payload["id"])
+    except InvalidCursor:
+        raise
+    except (ValueError, KeyError, TypeError, InvalidOperation) as e:
+        raise InvalidCursor("malformed cursor") from e
+
+
+def apply_cursor(query, sort_by: str, cursor: str):
+    """Keep only rows after the cursor: (column, id) < or > (value, last_id)"""
+    column_name, descending = SORTS[normalize_sort(sort_by)]
+    value, last_id = decode_cursor(sort_by, cursor)
+    key = tuple_(getattr(Job, column_name), Job.id)
+    bound = tuple_(value, last_id)
+    return query.where(key < bound if descending else key > bound)
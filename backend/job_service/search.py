@@ -0,0 +1,54 @@
+"""
+Job search for GET /jobs?search=.
+Terms of FTS_MIN_LENGTH or more characters match the weighted search_vector
+(title 'A', description 'B', maintained by trigger in init.sql) with prefix
+matching on every word, so partial words ("develop" -> "developer") still use
+the GIN index. Titles are also matched by pg_trgm word similarity, which
+catches typos and fragments; shorter terms use only that. Results are ranked
+by ts_rank_cd plus title similarity.
+"""
+
+import re
+from typing import Optional
+
+from sqlalchemy import func, or_
+
+from models import Job
+
+FTS_CONFIG = "english"
+FTS_MIN_LENGTH = 3
+
+# Letters and digits only, so user input can't inject tsquery operators
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+
+def prefix_tsquery(term: str) -> Optional[str]:
+    """'react develop' -> 'react:* & develop:*' (None if the term has no words)"""
+    words = WORD_PATTERN.findall(term.lower())
+    # Single letters ("dev's" -> "s") would prefix-match almost everything
+    words = [word for word in words if len(word) > 1] or words
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+
+def _uses_fts(term: str) -> Optional[str]:
+    return prefix_tsquery(term) if len(term) >= FTS_MIN_LENGTH else None
+
+
+def search_condition(term: str):
+    """WHERE clause matching jobs for a search term"""
+    similar_title = Job.title.op("%>")(term)
+    tsquery = _uses_fts(term)
+    if tsquery is None:
+        return similar_title
+    return or_(Job.search_vector.op("@@")(func.to_tsquery(FTS_CONFIG, tsquery)), similar_title)
+
+
+def relevance(term: str):
+    """Rank expression for ordering search results, higher is better"""
+    similarity = func.word_similarity(term, Job.title)
+    tsquery = _uses_fts(term)
+    if tsquery is None:
+        return similarity
+    return func.ts_rank_cd(Job.search_vector, func.to_tsquery(FTS_CONFIG, tsquery)) + similarity
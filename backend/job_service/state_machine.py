@@ -0,0 +1,111 @@
+"""
+Job lifecycle transitions.
+Each transition is one UPDATE jobs ... WHERE id = :id AND status IN (<sources>)
+AND <guards> RETURNING jobs.*, so checking a job's state and changing it is a
+single atomic round trip: of many workers racing to accept a job, exactly one
+gets the row back. The updated row stays locked until the caller commits, so
+side effects (escrow release/refund) can run before committing and a failure
+rolls the transition back. Only when no row comes back does one more SELECT
+work out why (missing job, wrong user, or a conflicting state).
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import literal_column, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from models import Job
+from shared.schemas import JobStatus
+
+
+class TransitionError(HTTPException):
+    status_code = status.HTTP_409_CONFLICT
+
+    def __init__(self, detail: str):
+        super().__init__(status_code=self.status_code, detail=detail)
+
+
+class JobNotFound(TransitionError):
+    status_code = status.HTTP_404_NOT_FOUND
+
+
+class TransitionForbidden(TransitionError):
+    status_code = status.HTTP_403_FORBIDDEN
+
+
+class TransitionConflict(TransitionError):
+    status_code = status.HTTP_409_CONFLICT
+
+
+# name -> (statuses the job may be in, status it moves to)
+TRANSITIONS: Dict[str, Tuple[Tuple[JobStatus, ...], JobStatus]] = {
+    "accept": ((JobStatus.OPEN,), JobStatus.IN_PROGRESS),
+    "withdraw": ((JobStatus.IN_PROGRESS,), JobStatus.OPEN),
+    "complete": ((JobStatus.IN_PROGRESS,), JobStatus.COMPLETED),
+    "cancel": ((JobStatus.OPEN,), JobStatus.CANCELLED),
+}
+
+# Every checklist item marked not completed (withdraw hands the job back untouched)
+RESET_CHECKLIST = literal_column(
+    "(SELECT COALESCE(jsonb_agg(item || '{\"completed\": false}'::jsonb), '[]'::jsonb) "
+    "FROM jsonb_array_elements(jobs.checklist) AS item)"
+)
+
+# A guard is a condition on the job row plus the error raised when it fails;
+# TransitionForbidden guards are reported before the status check, others after
+Guard = Tuple[ColumnElement, TransitionError]
+
+
+async def transition(
+    session: AsyncSession,
+    job_id: int,
+    name: str,
+    guards: Sequence[Guard] = (),
+    values: Optional[dict] = None
+) -> Job:
+    """
+    Apply a transition and return the updated job (not committed).
+    Raises JobNotFound, TransitionForbidden or TransitionConflict when the
+    job is missing, a guard fails, or its status does not allow the transition.
+    """
+    sources, target = TRANSITIONS[name]
+    result = await session.execute(
+        update(Job)
+        .where(
+            Job.id == job_id,
+            Job.status.in_([source.value for source in sources]),
+            *(condition for condition, _ in guards)
+        )
+        .values(status=target.value, **(values or {}))
+        .returning(Job)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    job = result.scalar_one_or_none()
+    if job is None:
+        await _raise_failure(session, job_id, name, sources, guards)
+    return job
+
+
+async def _raise_failure(session: AsyncSession, job_id: int, name: str, sources, guards: Sequence[Guard]):
+    """Find out which condition stopped the transition (one SELECT, conditions evaluated in SQL)"""
+    result = await session.execute(
+        select(Job.status, *(condition for condition, _ in guards)).where(Job.id == job_id)
+    )
+    row = result.first()
+    if row is None:
+        raise JobNotFound("Job not found")
+
+    current_status, passed = row[0], list(row[1:])
+    failed = [error for (_, error), ok in zip(guards, passed) if not ok]
+
+    for error in failed:
+        if isinstance(error, TransitionForbidden):
+            raise error
+    if current_status not in {source.value for source in sources}:
+        raise TransitionConflict(f"Cannot {name} a job that is {current_status}")
+    if failed:
+        raise failed[0]
+    # Changed between the UPDATE and the SELECT: report it as a conflict
+    raise TransitionConflict(f"Job changed while trying to {name} it, please retry")
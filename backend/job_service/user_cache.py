@@ -0,0 +1,122 @@
+"""
+In-process cache of public user profiles for the Job Service.
+Bounded LRU with a TTL per entry; entries are dropped early when the user
+service publishes a change for that user on the user_events channel.
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+import redis.asyncio as redis
+import logging
+
+from shared.user_events import USER_EVENTS_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+
+class UserProfileCache:
+    """user_id -> public profile (username, wallet_address, ...)"""
+
+    def __init__(self, redis_url: str, max_size: int = 1000, ttl: float = 300.0):
+        self.redis_url = redis_url
+        self.max_size = max_size
+        self.ttl = ttl
+        self.redis_client: Optional[redis.Redis] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._entries: "OrderedDict[int, Tuple[dict, float]]" = OrderedDict()
+        # Bumped on every invalidation; fetches that straddle one are not cached
+        self.generation = 0
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    async def connect(self):
+        """Start listening for user change events"""
+        if self.redis_client:
+            return
+        self.redis_client = await redis.from_url(self.redis_url, socket_connect_timeout=1)
+        self._listener = asyncio.create_task(self._listen_for_invalidations())
+        logger.info("✅ User profile cache listening for user events")
+
+    async def close(self):
+        """Stop the invalidation listener and close Redis connection"""
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        if self.redis_client:
+            await self.redis_client.close()
+            logger.info("👋 User profile cache disconnected")
+
+    def get_many(self, user_ids: Iterable[int]) -> Tuple[Dict[int, dict], List[int]]:
+        """Split user IDs into cached profiles and IDs that must be fetched"""
+        found, missing = {}, []
+        now = time.monotonic()
+        for user_id in user_ids:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                found[user_id] = entry[0]
+                self._stats["hits"] += 1
+                continue
+            if entry is not None:
+                del self._entries[user_id]
+                self._stats["expired"] += 1
+            missing.append(user_id)
+            self._stats["misses"] += 1
+        return found, missing
+
+    def set_many(self, profiles: Dict[int, dict], generation: Optional[int] = None):
+        """Cache fetched profiles (skipped if an invalidation arrived since generation was read)"""
+        if generation is not None and generation != self.generation:
+            return
+        expires_at = time.monotonic() + self.ttl
+        for user_id, profile in profiles.items():
+            self._entries[user_id] = (profile, expires_at)
+            self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def invalidate(self, user_id: Optional[int] = None):
+        """Drop one user's profile, or everything when user_id is None"""
+        if user_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(user_id, None)
+        self.generation += 1
+        self._stats["invalidations"] += 1
+
+    async def _listen_for_invalidations(self):
+        """Consume user change events from the user service, reconnecting on errors"""
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(USER_EVENTS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    event = json.loads(message["data"])
+                    self.invalidate(event.get("user_id"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Changes published while disconnected are lost: start over
+                logger.warning(f"User event subscription lost, clearing cache and retrying: {e}")
+                self.invalidate()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def get_stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else None,
+            **self._stats,
+        }
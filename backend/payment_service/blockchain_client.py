@@ -1,15 +1,23 @@
 from web3 import Web3
+from web3.exceptions import TimeExhausted
 from eth_account import Account
+from contextlib import nullcontext
 import json
 import logging
 from typing import Optional
 
+from shared.deadline import DeadlineExceeded, expired, record_expired, timeout_for
+
 logger = logging.getLogger(__name__)
 
+# web3's default; shortened to the request's remaining budget when it has one
+RECEIPT_TIMEOUT = 120.0
+
 
 class BlockchainClient:
-    def __init__(self, ganache_url: str, contract_address: str, private_key: str):
+    def __init__(self, ganache_url: str, contract_address: str, private_key: str, tracer=None):
         self.w3 = Web3(Web3.HTTPProvider(ganache_url))
+        self.tracer = tracer
         self.contract_address = Web3.to_checksum_address(contract_address) if contract_address else None
         self.account = Account.from_key(private_key)
         self.contract = None
@@ -29,6 +37,31 @@ class BlockchainClient:
             logger.warning("⚠️  Contract ABI not found. Run deployment first.")
             self.contract_abi = []
     
+    def _span(self, name: str, **attributes):
+        """Timing span for a blockchain step (no-op without a tracer)"""
+        return self.tracer.span(name, "client", attributes) if self.tracer else nullcontext()
+    
+    def _send_and_wait(self, signed_txn):
+        """
+        Broadcast a signed transaction and wait for its receipt, within the
+        request's remaining time budget. Nothing is broadcast once the budget
+        is spent; a receipt wait that runs out leaves the transaction pending.
+        """
+        if expired():
+            record_expired("outbound")
+            raise DeadlineExceeded("Request deadline exceeded before broadcast")
+        
+        with self._span("blockchain.send_transaction"):
+            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+        
+        timeout = timeout_for(RECEIPT_TIMEOUT)
+        with self._span("blockchain.wait_receipt", tx_hash=tx_hash.hex(), timeout_s=timeout):
+            try:
+                return self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+            except TimeExhausted:
+                logger.warning(f"⚠️  No receipt for {tx_hash.hex()} within {timeout:.1f}s - it may still be mined")
+                raise
+    
     def is_connected(self) -> bool:
         """Check if connected to blockchain"""
         try:
@@ -81,11 +114,8 @@ class BlockchainClient:
             # Sign transaction with employer's key
             signed_txn = self.w3.eth.account.sign_transaction(txn, employer_key)
             
-            # Send transaction
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            
-            # Wait for receipt
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            # Send transaction and wait for receipt
+            receipt = self._send_and_wait(signed_txn)
             
             return {
                 'transaction_hash': receipt['transactionHash'].hex(),
@@ -129,10 +159,7 @@ class BlockchainClient:
             
             # Sign and send
             signed_txn = self.w3.eth.account.sign_transaction(txn, self.account.key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            
-            # Wait for receipt
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = self._send_and_wait(signed_txn)
             
             # Get job details to calculate amounts
             job_data = self.contract.functions.getJob(job_id).call()
@@ -170,10 +197,7 @@ class BlockchainClient:
             
             # Sign and send
             signed_txn = self.w3.eth.account.sign_transaction(txn, self.account.key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            
-            # Wait for receipt
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = self._send_and_wait(signed_txn)
             
             return {
                 'transaction_hash': receipt['transactionHash'].hex(),
@@ -210,10 +234,7 @@ class BlockchainClient:
             
             # Sign and send with employer's key
             signed_txn = self.w3.eth.account.sign_transaction(txn, employer_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            
-            # Wait for receipt
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = self._send_and_wait(signed_txn)
             
             return {
                 'transaction_hash': receipt['transactionHash'].hex(),
@@ -226,6 +247,26 @@ class BlockchainClient:
             logger.error(f"Cancel job failed: {e}")
             return None
     
+    def get_escrow(self, job_id: int) -> Optional[dict]:
+        """Escrow already created on-chain for this job ID, or None (RPC errors propagate)"""
+        if not self.contract:
+            raise Exception("Contract not initialized")
+        
+        # Public mapping getter: a zeroed struct for unknown IDs instead of a revert
+        job_data = self.contract.functions.jobs(job_id).call()
+        employer = job_data[1]
+        if int(employer, 16) == 0:
+            return None
+        
+        return {
+            'employer': employer,
+            'amount_eth': float(self.w3.from_wei(job_data[3], 'ether')),
+            'is_locked': job_data[7],
+            'is_completed': job_data[8],
+            'is_refunded': job_data[9],
+            'contract_address': self.contract_address
+        }
+    
     def get_job_balance(self, job_id: int) -> float:
         """Get locked balance for job"""
         try:
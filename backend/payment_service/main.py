@@ -10,6 +10,9 @@ import logging
 from shared.config import get_settings
 from shared.database import get_database
 from shared.auth_guard import get_current_user, verify_service_key
+from shared.tracing import TracingMiddleware, get_tracer
+from shared.deadline import DeadlineMiddleware, ensure_time_left
+from shared.deadline import get_stats as get_deadline_stats
 from blockchain_client import BlockchainClient
 
 logging.basicConfig(level=logging.INFO)
@@ -19,13 +22,14 @@ app = FastAPI(title="PayChain Payment Service", version="1.0.0")
 
 settings = get_settings()
 db = get_database(settings.DATABASE_URL)
+tracer = get_tracer("payment-service")
 
 # Initialize blockchain client
 GANACHE_URL = os.getenv("GANACHE_URL", "http://ganache:8545")
 CONTRACT_ADDRESS = os.getenv("CONTRACT_ADDRESS", "")
 PLATFORM_PRIVATE_KEY = os.getenv("PLATFORM_PRIVATE_KEY", "")
 
-blockchain = BlockchainClient(GANACHE_URL, CONTRACT_ADDRESS, PLATFORM_PRIVATE_KEY)
+blockchain = BlockchainClient(GANACHE_URL, CONTRACT_ADDRESS, PLATFORM_PRIVATE_KEY, tracer=tracer)
 
 app.add_middleware(
     CORSMiddleware,
@@ -35,6 +39,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Remaining time budget from X-Request-Timeout-Ms. Escrow writes are never
+# cancelled mid-flight; they check the budget before broadcasting instead
+app.add_middleware(DeadlineMiddleware)
+
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
 
 # Security headers middleware
 @app.middleware("http")
@@ -80,6 +90,8 @@ async def startup():
         logger.error("❌ JWT_SECRET_KEY is not set!")
         raise ValueError("JWT_SECRET_KEY must be set in environment variables")
     
+    await tracer.start()
+    
     if blockchain.is_connected():
         logger.info("✅ Payment Service started - Blockchain connected")
     else:
@@ -89,6 +101,7 @@ async def startup():
 @app.on_event("shutdown")
 async def shutdown():
     await db.close()
+    await tracer.shutdown()
     logger.info("👋 Payment Service stopped")
 
 
@@ -102,7 +115,8 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "payment-service",
-        "blockchain": blockchain_status
+        "blockchain": blockchain_status,
+        "deadlines": get_deadline_stats()
     }
 
 
@@ -119,6 +133,26 @@ async def lock_funds(
                 detail="Blockchain service unavailable"
             )
         
+        # Caller has given up: don't start a transaction nobody waits for
+        ensure_time_left()
+        
+        # The job ID is the idempotency key: a retried lock (e.g. from the job
+        # service's escrow outbox) reports the escrow that already exists
+        existing = blockchain.get_escrow(request.job_id)
+        if existing:
+            if existing['employer'].lower() != request.employer_wallet.lower():
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Escrow for this job belongs to another employer"
+                )
+            logger.info(f"Funds already locked for job {request.job_id}")
+            return {
+                "transaction_hash": None,
+                "contract_address": existing['contract_address'],
+                "gas_used": 0,
+                "status": "already_locked"
+            }
+        
         # Create job in smart contract
         result = blockchain.create_job(
             job_id=request.job_id,
@@ -165,6 +199,8 @@ async def release_payment(
                 detail="Blockchain service unavailable"
             )
         
+        ensure_time_left()
+        
         # Release payment from smart contract
         result = blockchain.release_payment(
             job_id=request.job_id,
@@ -210,6 +246,19 @@ async def refund_escrow(
                 detail="Blockchain service unavailable"
             )
         
+        ensure_time_left()
+        
+        # Retried refunds (e.g. the job service's expiry sweeper after a
+        # failed status update) report the earlier refund instead of reverting
+        existing = blockchain.get_escrow(request.job_id)
+        if existing and existing['is_refunded']:
+            logger.info(f"Job {request.job_id} already refunded")
+            return {
+                "transaction_hash": None,
+                "gas_used": 0,
+                "status": "already_refunded"
+            }
+        
         # Refund from smart contract
         result = blockchain.refund_expired_job(request.job_id)
         
@@ -251,6 +300,8 @@ async def cancel_job_escrow(
                 detail="Blockchain service unavailable"
             )
         
+        ensure_time_left()
+        
         # Cancel job in smart contract
         result = blockchain.cancel_job(request.job_id, employer_wallet)
         
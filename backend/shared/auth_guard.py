@@ -9,6 +9,8 @@ from typing import Optional, List
 from .auth import decode_token
 from .config import get_settings
 from .token_blacklist import get_token_blacklist
+from .internal_identity import verify_identity
+from .consistency import set_consistency_key
 from datetime import datetime
 import logging
 
@@ -22,12 +24,43 @@ class JWTAuthGuard:
         self.settings = get_settings()
         self.blacklist = get_token_blacklist(self.settings.REDIS_URL)
     
-    async def verify_token(self, authorization: str = Header(...)) -> dict:
+    def verify_internal_identity(self, internal_identity: str) -> dict:
+        """
+        Verify the gateway-signed identity header (single HMAC comparison).
+        Raises HTTPException if invalid.
+        """
+        if not self.settings.INTERNAL_IDENTITY_SECRET:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Internal identity not accepted",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        payload = verify_identity(internal_identity, self.settings.INTERNAL_IDENTITY_SECRET)
+        if not payload:
+            logger.warning("Rejected invalid or expired internal identity header")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired internal identity",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        return payload
+    
+    async def verify_token(self, authorization: str = Header(...), internal_identity: Optional[str] = None) -> dict:
         """
         Verify JWT token and return payload.
         Checks token blacklist for revoked tokens.
+        When TRUST_GATEWAY_IDENTITY is enabled, a gateway-signed identity header
+        replaces the JWT decode and blacklist lookups.
         Raises HTTPException if invalid.
         """
+        if internal_identity and self.settings.TRUST_GATEWAY_IDENTITY:
+            payload = self.verify_internal_identity(internal_identity)
+            # Read-your-writes routing for replica reads (shared.database)
+            set_consistency_key(str(payload.get("sub")))
+            return payload
+        
         try:
             if not authorization:
                 raise HTTPException(
@@ -84,6 +117,7 @@ class JWTAuthGuard:
                         headers={"WWW-Authenticate": "Bearer"},
                     )
             
+            set_consistency_key(str(user_id))
             return payload
             
         except HTTPException:
@@ -101,8 +135,11 @@ class JWTAuthGuard:
         Dependency to require authentication.
         Returns user payload from JWT.
         """
-        async def _verify(authorization: str = Header(...)) -> dict:
-            return await self.verify_token(authorization)
+        async def _verify(
+            authorization: str = Header(...),
+            x_internal_identity: Optional[str] = Header(None)
+        ) -> dict:
+            return await self.verify_token(authorization, x_internal_identity)
         return _verify
     
     def require_user_type(self, allowed_types: List[str]):
@@ -110,8 +147,11 @@ class JWTAuthGuard:
         Dependency to require specific user type(s).
         Example: require_user_type(["employer"])
         """
-        async def _verify(authorization: str = Header(...)) -> dict:
-            payload = await self.verify_token(authorization)
+        async def _verify(
+            authorization: str = Header(...),
+            x_internal_identity: Optional[str] = Header(None)
+        ) -> dict:
+            payload = await self.verify_token(authorization, x_internal_identity)
             
             user_type = payload.get("user_type")
             if user_type not in allowed_types:
@@ -136,12 +176,15 @@ class JWTAuthGuard:
         Dependency for optional authentication.
         Returns user payload if authenticated, None otherwise.
         """
-        async def _verify(authorization: Optional[str] = Header(None)) -> Optional[dict]:
+        async def _verify(
+            authorization: Optional[str] = Header(None),
+            x_internal_identity: Optional[str] = Header(None)
+        ) -> Optional[dict]:
             if not authorization:
                 return None
             
             try:
-                return await self.verify_token(authorization)
+                return await self.verify_token(authorization, x_internal_identity)
             except HTTPException:
                 return None
         return _verify
@@ -189,6 +232,8 @@ class JWTAuthGuard:
             valid_keys.append(self.settings.PAYMENT_SERVICE_API_KEY)
         if self.settings.WS_SERVICE_API_KEY:
             valid_keys.append(self.settings.WS_SERVICE_API_KEY)
+        if self.settings.JOB_SERVICE_API_KEY:
+            valid_keys.append(self.settings.JOB_SERVICE_API_KEY)
         
         # Check if provided key matches any valid service key
         if x_service_api_key not in valid_keys:
@@ -216,24 +261,36 @@ auth_guard = JWTAuthGuard()
 
 
 # Convenience dependencies for common use cases
-async def get_current_user(authorization: str = Header(...)) -> dict:
-    """Get current authenticated user from JWT token"""
-    return await auth_guard.verify_token(authorization)
+async def get_current_user(
+    authorization: str = Header(...),
+    x_internal_identity: Optional[str] = Header(None)
+) -> dict:
+    """Get current authenticated user from JWT token (or gateway identity header)"""
+    return await auth_guard.verify_token(authorization, x_internal_identity)
 
 
-async def get_current_user_optional(authorization: Optional[str] = Header(None)) -> Optional[dict]:
+async def get_current_user_optional(
+    authorization: Optional[str] = Header(None),
+    x_internal_identity: Optional[str] = Header(None)
+) -> Optional[dict]:
     """Get current user if authenticated, None otherwise"""
-    return await auth_guard.optional_auth()(authorization)
+    return await auth_guard.optional_auth()(authorization, x_internal_identity)
 
 
-async def require_employer(authorization: str = Header(...)) -> dict:
+async def require_employer(
+    authorization: str = Header(...),
+    x_internal_identity: Optional[str] = Header(None)
+) -> dict:
     """Require employer user type"""
-    return await auth_guard.require_employer()(authorization)
+    return await auth_guard.require_employer()(authorization, x_internal_identity)
 
 
-async def require_worker(authorization: str = Header(...)) -> dict:
+async def require_worker(
+    authorization: str = Header(...),
+    x_internal_identity: Optional[str] = Header(None)
+) -> dict:
     """Require worker user type"""
-    return await auth_guard.require_worker()(authorization)
+    return await auth_guard.require_worker()(authorization, x_internal_identity)
 
 
 async def verify_service_key(x_service_api_key: str = Header(...)) -> bool:
@@ -8,6 +8,12 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    # Optional read replicas (comma-separated URLs) for read-only sessions
+    DATABASE_REPLICA_URLS: Optional[str] = None
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    # How long a user's reads stay on the primary after they write
+    # (defaults to the max replica lag)
+    DATABASE_READ_YOUR_WRITES_SECONDS: Optional[float] = None
     
     # JWT
     JWT_SECRET_KEY: str
@@ -21,12 +27,39 @@ class Settings(BaseSettings):
     PAYMENT_SERVICE_API_KEY: Optional[str] = None
     WS_SERVICE_API_KEY: Optional[str] = "dev-ws-service-key-change-in-production"
     
+    # Gateway-signed identity header (X-Internal-Identity)
+    INTERNAL_IDENTITY_SECRET: Optional[str] = None
+    INTERNAL_IDENTITY_TTL_SECONDS: int = 30
+    TRUST_GATEWAY_IDENTITY: bool = False
+    
     # Service URLs
     USER_SERVICE_URL: Optional[str] = None
     JOB_SERVICE_URL: Optional[str] = None
     PAYMENT_SERVICE_URL: Optional[str] = None
     WS_SERVICE_URL: Optional[str] = None
     
+    # Job service: resolve usernames through the user service API ("http")
+    # or by joining the shared users table ("join")
+    JOB_USERNAME_LOOKUP: str = "http"
+    # Job service: in-process cache of public user profiles
+    JOB_USER_CACHE_SIZE: int = 1000
+    JOB_USER_CACHE_TTL_SECONDS: int = 300
+    # Job service: default total-count strategy for GET /jobs
+    # ("exact", "cached", "estimate" or "none") and its tuning
+    JOB_COUNT_STRATEGY: str = "cached"
+    JOB_COUNT_CACHE_TTL_SECONDS: int = 30
+    JOB_COUNT_ESTIMATE_MIN_ROWS: int = 10000
+    # Job service: escrow outbox worker (locks funds for new jobs)
+    JOB_ESCROW_OUTBOX_BATCH_SIZE: int = 10
+    JOB_ESCROW_OUTBOX_POLL_SECONDS: float = 1.0
+    JOB_ESCROW_LOCK_TIMEOUT_SECONDS: float = 150.0
+    JOB_ESCROW_LOCK_MAX_ATTEMPTS: int = 5
+    # Job service: background refunds for expired in-progress jobs
+    JOB_EXPIRY_SWEEP_ENABLED: bool = True
+    JOB_EXPIRY_SWEEP_INTERVAL_SECONDS: float = 60.0
+    JOB_EXPIRY_SWEEP_BATCH_SIZE: int = 20
+    JOB_EXPIRY_REFUND_CONCURRENCY: int = 4
+    
     # CORS
     CORS_ALLOWED_ORIGINS: str = "http://localhost:5173"
     
@@ -36,6 +69,8 @@ class Settings(BaseSettings):
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     RATE_LIMIT_AUTH_PER_MINUTE: int = 10
+    RATE_LIMIT_REDIS_TIMEOUT_MS: int = 50
+    RATE_LIMIT_TRUST_FORWARDED: bool = False
     
     # Logging
     LOG_LEVEL: str = "INFO"
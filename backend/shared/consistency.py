@@ -0,0 +1,21 @@
+"""
+Read-Your-Writes Consistency Key
+Identifies whose writes a request should see (the authenticated user ID).
+The auth guard sets it and the database reads it when routing read-only
+sessions. Dependency-free so the API gateway can import the auth guard
+without SQLAlchemy installed.
+"""
+
+from contextvars import ContextVar
+from typing import Optional
+
+_consistency_key: ContextVar[Optional[str]] = ContextVar("consistency_key", default=None)
+
+
+def set_consistency_key(key: Optional[str]):
+    """Tie this request's reads and writes to a key (e.g. the user ID) for read-your-writes"""
+    _consistency_key.set(key)
+
+
+def get_consistency_key() -> Optional[str]:
+    return _consistency_key.get()
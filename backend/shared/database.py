@@ -1,25 +1,138 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base
-from typing import AsyncGenerator
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, declarative_base
+from typing import AsyncGenerator, Dict, List, Optional, Union
+import redis.asyncio as redis
+import asyncio
+import logging
+import random
+import time
+
+from .consistency import get_consistency_key
 
 Base = declarative_base()
 
+logger = logging.getLogger(__name__)
+
+# Redis key marking that a consistency key wrote recently (expires with the window)
+WRITE_MARKER_KEY = "db_recent_write:{}"
+
+# Replay lag in seconds: 0 on a primary or a replica that has replayed
+# everything it received, otherwise time since the last replayed transaction
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def _create_engine(database_url: str) -> AsyncEngine:
+    return create_async_engine(
+        database_url,
+        echo=False,
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True
+    )
+
+
+class _PrimarySession(AsyncSession):
+    """Session on the primary; commits start the read-your-writes window"""
+
+    async def commit(self):
+        await super().commit()
+        on_commit = self.info.get("on_commit")
+        if on_commit:
+            await on_commit()
+
+
+class _RoutingSession(Session):
+    """Sync session for read-only use, bound on first query to the engine picked by info["choose_engine"]"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        engine = self.info.get("engine")
+        if engine is None:
+            engine = self.info["engine"] = self.info["choose_engine"]()
+        return engine
+
+
+class Replica:
+    """A read replica and its last health check"""
 
-class Database:
     def __init__(self, database_url: str):
-        self.engine = create_async_engine(
-            database_url,
-            echo=False,
-            pool_size=10,
-            max_overflow=20,
-            pool_pre_ping=True
-        )
+        self.engine = _create_engine(database_url)
+        self.name = self.engine.url.render_as_string(hide_password=True)
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.reads = 0
+
+    async def _read_lag(self) -> float:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(REPLICA_LAG_SQL)
+            return float(result.scalar())
+
+    async def check(self, timeout: float):
+        try:
+            self.lag = await asyncio.wait_for(self._read_lag(), timeout)
+            self.healthy = True
+        except Exception as e:
+            if self.healthy:
+                logger.warning(f"⚠️  Read replica {self.name} unhealthy: {e}")
+            self.healthy = False
+        self.checked_at = time.monotonic()
+
+    def get_stats(self) -> dict:
+        return {"url": self.name, "healthy": self.healthy, "lag": self.lag, "reads": self.reads}
+
+
+class Database:
+    def __init__(
+        self,
+        database_url: str,
+        replica_urls: Optional[List[str]] = None,
+        max_replica_lag: float = 5.0,
+        read_your_writes_window: Optional[float] = None,
+        health_check_interval: float = 5.0,
+        write_marker_url: Optional[str] = None
+    ):
+        self.engine = _create_engine(database_url)
         self.async_session = async_sessionmaker(
             self.engine,
-            class_=AsyncSession,
-            expire_on_commit=False
+            class_=_PrimarySession,
+            expire_on_commit=False,
+            info={"on_commit": self._record_write}
         )
-    
+
+        # Read replicas: used by get_read_session() while healthy and within max_replica_lag
+        self.replicas = [Replica(url) for url in replica_urls or []]
+        self.max_replica_lag = max_replica_lag
+        # A replica may trail by up to max_replica_lag, so writers read from
+        # the primary at least that long by default
+        self.read_your_writes_window = (
+            max_replica_lag if read_your_writes_window is None else read_your_writes_window
+        )
+        self.health_check_interval = health_check_interval
+        # Recent writes are marked in Redis so every service replica and
+        # worker process sees them; the local dict covers this process when
+        # Redis is not configured or unreachable
+        self.write_marker_url = write_marker_url
+        self._write_markers: Optional[redis.Redis] = None
+        self._recent_writes: Dict[str, float] = {}
+        self._monitor: Optional[asyncio.Task] = None
+        self._read_stats = {"read_your_writes": 0, "no_replica": 0, "marker_errors": 0}
+
+    async def start(self):
+        """Check replicas once, then keep checking them in the background"""
+        if not self.replicas or self._monitor:
+            return
+        if self.write_marker_url:
+            self._write_markers = redis.from_url(self.write_marker_url, decode_responses=True)
+        await self._check_replicas()
+        self._monitor = asyncio.create_task(self._monitor_replicas())
+        healthy = sum(replica.healthy for replica in self.replicas)
+        logger.info(f"✅ Read replicas: {healthy}/{len(self.replicas)} healthy")
+
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
         async with self.async_session() as session:
             try:
@@ -29,10 +142,121 @@ class Database:
                 raise
             finally:
                 await session.close()
-    
+
+    async def get_read_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Session for read-only handlers. Queries go to a healthy replica within
+        max_replica_lag, or to the primary when there is none or when this
+        request's consistency key wrote within read_your_writes_window.
+        """
+        if not self.replicas:
+            async for session in self.get_session():
+                yield session
+            return
+
+        wrote_recently = await self._wrote_recently(get_consistency_key())
+        session = AsyncSession(
+            sync_session_class=_RoutingSession,
+            expire_on_commit=False,
+            info={"choose_engine": lambda: self._choose_read_engine(wrote_recently)}
+        )
+        async with session:
+            try:
+                yield session
+            except Exception:
+                await session.rollback()
+                raise
+
+    async def _record_write(self):
+        key = get_consistency_key()
+        if key is None or not self.replicas:
+            return
+        now = time.monotonic()
+        if len(self._recent_writes) > 10000:
+            self._recent_writes = {k: t for k, t in self._recent_writes.items() if t > now}
+        self._recent_writes[key] = now + self.read_your_writes_window
+        if self._write_markers and self.read_your_writes_window > 0:
+            try:
+                await self._write_markers.set(
+                    WRITE_MARKER_KEY.format(key), 1,
+                    px=max(1, int(self.read_your_writes_window * 1000))
+                )
+            except Exception as e:
+                self._read_stats["marker_errors"] += 1
+                logger.debug(f"Recording write marker failed: {e}")
+
+    async def _wrote_recently(self, key: Optional[str]) -> bool:
+        if key is None:
+            return False
+        if self._recent_writes.get(key, 0) > time.monotonic():
+            return True
+        if self._write_markers:
+            try:
+                return bool(await self._write_markers.exists(WRITE_MARKER_KEY.format(key)))
+            except Exception as e:
+                self._read_stats["marker_errors"] += 1
+                logger.debug(f"Reading write marker failed: {e}")
+        return False
+
+    def _choose_read_engine(self, wrote_recently: bool = False):
+        if wrote_recently:
+            self._read_stats["read_your_writes"] += 1
+            return self.engine.sync_engine
+
+        candidates = [
+            replica for replica in self.replicas
+            if replica.healthy and replica.lag is not None and replica.lag <= self.max_replica_lag
+        ]
+        if not candidates:
+            self._read_stats["no_replica"] += 1
+            return self.engine.sync_engine
+
+        replica = random.choice(candidates)
+        replica.reads += 1
+        return replica.engine.sync_engine
+
+    async def _check_replicas(self):
+        await asyncio.gather(*(
+            replica.check(timeout=self.health_check_interval) for replica in self.replicas
+        ))
+
+    async def _monitor_replicas(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self._check_replicas()
+            except Exception as e:
+                logger.warning(f"Replica health check failed: {e}")
+
+    def get_stats(self) -> dict:
+        return {
+            "max_replica_lag": self.max_replica_lag,
+            "read_your_writes_window": self.read_your_writes_window,
+            "shared_write_markers": self._write_markers is not None,
+            "primary_reads": self._read_stats,
+            "replicas": [replica.get_stats() for replica in self.replicas],
+        }
+
     async def close(self):
+        if self._monitor:
+            self._monitor.cancel()
+            try:
+                await self._monitor
+            except asyncio.CancelledError:
+                pass
+        if self._write_markers:
+            await self._write_markers.close()
+        for replica in self.replicas:
+            await replica.engine.dispose()
         await self.engine.dispose()
 
 
-def get_database(database_url: str) -> Database:
-    return Database(database_url)
+def get_database(
+    database_url: str,
+    replica_urls: Union[str, List[str], None] = None,
+    **kwargs
+) -> Database:
+    """replica_urls may be a list or a comma-separated string (e.g. from settings)"""
+    if isinstance(replica_urls, str):
+        replica_urls = [url.strip() for url in replica_urls.split(",") if url.strip()]
+    return Database(database_url, replica_urls, **kwargs)
@@ -0,0 +1,218 @@
+"""
+Request Deadlines
+Propagates the remaining time budget of a request across service hops in the
+X-Request-Timeout-Ms header (milliseconds left, relative, so hosts don't need
+synchronised clocks).
+
+- DeadlineMiddleware reads the header (or applies a default budget at the
+  edge), rejects requests that arrive already expired and cancels safe
+  (GET/HEAD) requests that run out of time before responding.
+- apply_deadline, an httpx request hook, clamps outbound timeouts to the
+  remaining budget, forwards the header and refuses to start calls once the
+  budget is spent.
+- Expired work is counted per stage (arrival, in_flight, outbound).
+
+Unsafe methods are not cancelled mid-flight: tearing a write apart between
+an escrow call and the database commit would leave the two out of step.
+They stop at their next outbound call instead.
+"""
+
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+import httpx
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+
+# Absolute deadline of the current request on the local monotonic clock
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+_expired: Dict[str, int] = {"arrival": 0, "in_flight": 0, "outbound": 0}
+
+
+class DeadlineExceeded(httpx.TimeoutException):
+    """Raised instead of starting an outbound call once the request budget is spent"""
+
+    def __init__(self, message: str = "Request deadline exceeded", request: Optional[httpx.Request] = None):
+        super().__init__(message, request=request)
+
+
+def parse_budget(value: Optional[str]) -> Optional[float]:
+    """Parse an X-Request-Timeout-Ms value into seconds (None if absent or invalid)"""
+    if not value:
+        return None
+    try:
+        return max(int(value), 0) / 1000
+    except ValueError:
+        return None
+
+
+def remaining() -> Optional[float]:
+    """Seconds left for the current request, or None without a deadline"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def clear_deadline():
+    """Drop the deadline in the current context (work shared between requests)"""
+    _deadline.set(None)
+
+
+def timeout_for(default: float) -> float:
+    """A local timeout bounded by the remaining budget (for non-httpx waits)"""
+    left = remaining()
+    return default if left is None else max(min(default, left), 0.0)
+
+
+def record_expired(stage: str):
+    _expired[stage] = _expired.get(stage, 0) + 1
+
+
+def ensure_time_left():
+    """Raise 504 before starting work that can't be abandoned halfway (e.g. a transaction)"""
+    if expired():
+        record_expired("in_flight")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Request deadline exceeded"
+        )
+
+
+async def apply_deadline(request: httpx.Request):
+    """httpx request hook: clamp timeouts to the remaining budget and forward it"""
+    left = remaining()
+    if left is None:
+        return
+    if left <= 0:
+        record_expired("outbound")
+        raise DeadlineExceeded(request=request)
+
+    request.headers[DEADLINE_HEADER] = str(int(left * 1000))
+    timeouts = request.extensions.get("timeout", {})
+    request.extensions["timeout"] = {
+        key: left if timeouts.get(key) is None else min(timeouts[key], left)
+        for key in ("connect", "read", "write", "pool")
+    }
+
+
+# Pass as httpx.AsyncClient(event_hooks=DEADLINE_HOOKS)
+DEADLINE_HOOKS = {"request": [apply_deadline]}
+
+
+def get_stats() -> dict:
+    """Expired request counts per stage"""
+    return {"expired": dict(_expired)}
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware setting the request deadline from X-Request-Timeout-Ms.
+    At the edge (default_timeout set) requests without the header get the
+    default budget and client-supplied budgets are capped at max_timeout.
+    The deadline only covers the time until the response starts.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        default_timeout: Optional[float] = None,
+        max_timeout: Optional[float] = None,
+        cancel_methods: tuple = ("GET", "HEAD"),
+        excluded_paths: tuple = ("/health", "/metrics"),
+        response_headers: Optional[Dict[str, str]] = None,
+        observer: Optional[Callable] = None
+    ):
+        self.app = app
+        self.default_timeout = default_timeout
+        self.max_timeout = max_timeout
+        self.cancel_methods = cancel_methods
+        self.excluded_paths = excluded_paths
+        self.response_headers = response_headers
+        # Called as observer(stage, path) for every expired request
+        self.observer = observer
+
+    def _expire(self, stage: str, scope: Scope):
+        record_expired(stage)
+        logger.warning(f"⚠️  Deadline exceeded ({stage}): {scope['method']} {scope['path']}")
+        if self.observer:
+            try:
+                self.observer(stage, scope["path"])
+            except Exception as e:
+                logger.error(f"Deadline observer failed: {e}")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.excluded_paths):
+            await self.app(scope, receive, send)
+            return
+
+        budget = parse_budget(Headers(scope=scope).get(DEADLINE_HEADER))
+        if budget is None:
+            budget = self.default_timeout
+        elif self.max_timeout is not None:
+            budget = min(budget, self.max_timeout)
+
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        if budget <= 0:
+            self._expire("arrival", scope)
+            await self._timeout_response(scope, receive, send)
+            return
+
+        # Nested requests (gateway batch) keep the tighter of the two deadlines
+        deadline = time.monotonic() + budget
+        outer = _deadline.get()
+        if outer is not None:
+            deadline = min(deadline, outer)
+        token = _deadline.set(deadline)
+
+        if scope["method"] not in self.cancel_methods:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                _deadline.reset(token)
+            return
+
+        response_started = False
+        try:
+            async with asyncio.timeout(deadline - time.monotonic()) as timeout:
+                async def send_wrapper(message: Message):
+                    nonlocal response_started
+                    if message["type"] == "http.response.start":
+                        response_started = True
+                        timeout.reschedule(None)
+                    await send(message)
+
+                await self.app(scope, receive, send_wrapper)
+        except TimeoutError:
+            if not timeout.expired() or response_started:
+                raise
+            self._expire("in_flight", scope)
+            await self._timeout_response(scope, receive, send)
+        finally:
+            _deadline.reset(token)
+
+    async def _timeout_response(self, scope: Scope, receive: Receive, send: Send):
+        response = JSONResponse(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            content={"detail": "Request deadline exceeded"},
+            headers=self.response_headers
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,60 @@
+"""
+Change Events
+Best-effort Redis pub/sub publisher shared by the job and user change
+events; each channel carries {"type": ..., "<subject>_id": ...} messages
+"""
+
+import redis.asyncio as redis
+import json
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EventPublisher:
+    """
+    Publishes change events for one subject (e.g. "job") to a Redis channel.
+    Publishing is best-effort: failures are logged and never break the request.
+    """
+
+    def __init__(self, redis_url: str, channel: str, subject: str):
+        self.redis_url = redis_url
+        self.channel = channel
+        self.subject = subject
+        self.redis_client: Optional[redis.Redis] = None
+
+    async def connect(self):
+        """Initialize Redis connection"""
+        if not self.redis_client:
+            self.redis_client = await redis.from_url(
+                self.redis_url,
+                decode_responses=True
+            )
+            logger.info(f"✅ {self.subject.capitalize()} event publisher connected to Redis")
+
+    async def close(self):
+        """Close Redis connection"""
+        if self.redis_client:
+            await self.redis_client.close()
+            logger.info(f"👋 {self.subject.capitalize()} event publisher disconnected")
+
+    async def publish(self, event_type: str, subject_id: int):
+        """
+        Publish a change event.
+
+        Args:
+            event_type: Event name (job_created, user_updated, ...)
+            subject_id: ID of the job/user that changed
+        """
+        try:
+            if not self.redis_client:
+                await self.connect()
+
+            await self.redis_client.publish(
+                self.channel,
+                json.dumps({"type": event_type, f"{self.subject}_id": subject_id})
+            )
+
+        except Exception as e:
+            logger.warning(f"Failed to publish {self.subject} event '{event_type}' for {self.subject} {subject_id}: {e}")
@@ -0,0 +1,72 @@
+"""
+Signed Internal Identity Header
+The API Gateway verifies the user's JWT once (signature, type, blacklist) and
+forwards the resulting claims to downstream services as a compact
+HMAC-signed header. Services that trust the gateway check it with a single
+HMAC comparison instead of decoding the JWT and querying Redis again.
+
+Format: <base64url(json claims)>.<base64url(hmac-sha256)>
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Optional
+
+INTERNAL_IDENTITY_HEADER = "X-Internal-Identity"
+
+# JWT claims carried over to services (same shape get_current_user returns)
+IDENTITY_CLAIMS = ("sub", "wallet", "user_type", "username", "jti", "iat", "exp")
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _signature(payload: str, secret: str) -> str:
+    return _b64encode(hmac.new(secret.encode(), payload.encode(), hashlib.sha256).digest())
+
+
+def sign_identity(claims: dict, secret: str, ttl_seconds: int = 30) -> str:
+    """
+    Build a signed identity header value from verified JWT claims.
+    The header expires after ttl_seconds (or at token expiry, if sooner).
+    """
+    identity = {key: claims[key] for key in IDENTITY_CLAIMS if key in claims}
+    expires_at = int(time.time()) + ttl_seconds
+    identity["hdr_exp"] = min(expires_at, int(claims.get("exp", expires_at)))
+
+    payload = _b64encode(json.dumps(identity, separators=(",", ":")).encode())
+    return f"{payload}.{_signature(payload, secret)}"
+
+
+def verify_identity(value: str, secret: str) -> Optional[dict]:
+    """
+    Verify a signed identity header value.
+
+    Returns:
+        The user claims if the signature is valid and unexpired, None otherwise
+    """
+    try:
+        payload, signature = value.split(".", 1)
+    except ValueError:
+        return None
+
+    if not hmac.compare_digest(signature, _signature(payload, secret)):
+        return None
+
+    try:
+        identity = json.loads(_b64decode(payload))
+    except ValueError:
+        return None
+
+    if identity.pop("hdr_exp", 0) < time.time():
+        return None
+
+    return identity
@@ -0,0 +1,23 @@
+"""
+Job Change Events
+Publishes job lifecycle changes over Redis pub/sub so other components
+(e.g. the API Gateway response cache) can react to them
+"""
+
+from typing import Optional
+
+from .events import EventPublisher
+
+# Redis pub/sub channel carrying {"type": ..., "job_id": ...} messages
+JOB_EVENTS_CHANNEL = "job_events"
+
+# Global instance
+_publisher: Optional[EventPublisher] = None
+
+
+def get_job_event_publisher(redis_url: str) -> EventPublisher:
+    """Get or create job event publisher instance"""
+    global _publisher
+    if not _publisher:
+        _publisher = EventPublisher(redis_url, JOB_EVENTS_CHANNEL, "job")
+    return _publisher
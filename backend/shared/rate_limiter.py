@@ -0,0 +1,256 @@
+"""
+Distributed Rate Limiter
+Token-bucket rate limiting shared across processes and services via Redis.
+Each check is one atomic Lua script call (one round trip). If Redis is slow
+or unavailable, checks fall back to an in-process bucket for a short cooldown
+so requests are never blocked on Redis.
+"""
+
+import redis.asyncio as redis
+from fastapi import HTTPException, Request, Response, status
+import asyncio
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] = bucket key
+# ARGV = capacity, refill rate (tokens/second), cost
+# Uses the Redis clock so every replica sees the same time.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill_rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / refill_rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / refill_rate * 1000) + 1000)
+
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+RATE_PERIODS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+    backend: str
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """
+    Parse a rate string like '10/minute' or '100/hour'.
+
+    Returns:
+        (limit, period in seconds)
+    """
+    count, _, period = rate.partition("/")
+    period = period.strip().lower().rstrip("s")
+    if period not in RATE_PERIODS:
+        raise ValueError(f"Invalid rate '{rate}' (expected e.g. '10/minute')")
+    return int(count), RATE_PERIODS[period]
+
+
+def client_ip(request: Request, trust_forwarded: bool = False) -> str:
+    """
+    Client address for rate limit keys. Behind the API Gateway every request
+    comes from the gateway, so services can opt in to X-Forwarded-For. The
+    last entry is the one the gateway appended; earlier ones are client-supplied.
+    """
+    if trust_forwarded:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit_headers(result: RateLimitResult) -> Dict[str, str]:
+    headers = {
+        "X-RateLimit-Limit": str(result.limit),
+        "X-RateLimit-Remaining": str(max(result.remaining, 0)),
+    }
+    if not result.allowed:
+        headers["Retry-After"] = str(max(int(result.retry_after + 0.999), 1))
+    return headers
+
+
+class LocalTokenBucket:
+    """In-process token buckets, used while Redis is unavailable"""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def hit(self, key: str, capacity: int, refill_rate: float, cost: int = 1) -> Tuple[bool, float, float]:
+        now = time.monotonic()
+        tokens, ts = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - ts) * refill_rate)
+
+        if tokens >= cost:
+            tokens -= cost
+            allowed, retry_after = True, 0.0
+        else:
+            allowed, retry_after = False, (cost - tokens) / refill_rate
+
+        if len(self._buckets) >= self.max_keys and key not in self._buckets:
+            self._buckets.clear()
+        self._buckets[key] = (tokens, now)
+        return allowed, tokens, retry_after
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter backed by Redis.
+    A rate of N/period allows bursts of up to N requests and refills at N per period.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        prefix: str = "ratelimit",
+        redis_timeout: float = 0.05,
+        fallback_cooldown: float = 5.0,
+        trust_forwarded: bool = False
+    ):
+        self.redis_url = redis_url
+        self.prefix = prefix
+        self.redis_timeout = redis_timeout
+        self.fallback_cooldown = fallback_cooldown
+        self.trust_forwarded = trust_forwarded
+        self.redis_client: Optional[redis.Redis] = None
+        self._script = None
+        self._local = LocalTokenBucket()
+        self._redis_down_until = 0.0
+        self.stats = {"redis": 0, "local": 0, "redis_errors": 0, "rejected": 0}
+
+    async def connect(self):
+        """Initialize Redis connection"""
+        if not self.redis_client:
+            self.redis_client = await redis.from_url(
+                self.redis_url,
+                decode_responses=True,
+                socket_connect_timeout=1
+            )
+            self._script = self.redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+            logger.info("✅ Rate limiter connected to Redis")
+
+    async def close(self):
+        """Close Redis connection"""
+        if self.redis_client:
+            await self.redis_client.close()
+            logger.info("👋 Rate limiter disconnected")
+
+    async def hit(self, key: str, rate: str, cost: int = 1) -> RateLimitResult:
+        """
+        Take `cost` tokens from the bucket for `key`.
+
+        Args:
+            key: Bucket identity, e.g. 'auth_verify:wallet:0xabc...'
+            rate: Limit as '<count>/<second|minute|hour|day>'
+            cost: Tokens this request consumes
+        """
+        limit, period = parse_rate(rate)
+        refill_rate = limit / period
+        bucket_key = f"{self.prefix}:{key}"
+
+        if self.redis_client and time.monotonic() >= self._redis_down_until:
+            try:
+                allowed, tokens, retry_after = await asyncio.wait_for(
+                    self._script(keys=[bucket_key], args=[limit, refill_rate, cost]),
+                    timeout=self.redis_timeout
+                )
+                self.stats["redis"] += 1
+                return self._result(bool(int(allowed)), limit, float(tokens), float(retry_after), "redis")
+            except Exception as e:
+                self.stats["redis_errors"] += 1
+                self._redis_down_until = time.monotonic() + self.fallback_cooldown
+                logger.warning(
+                    f"⚠️  Rate limiter falling back to local buckets for {self.fallback_cooldown}s: "
+                    f"{type(e).__name__} {e}"
+                )
+
+        self.stats["local"] += 1
+        allowed, tokens, retry_after = self._local.hit(bucket_key, limit, refill_rate, cost)
+        return self._result(allowed, limit, tokens, retry_after, "local")
+
+    def _result(self, allowed: bool, limit: int, tokens: float, retry_after: float, backend: str) -> RateLimitResult:
+        if not allowed:
+            self.stats["rejected"] += 1
+        return RateLimitResult(allowed, limit, int(tokens), retry_after, backend)
+
+    async def enforce(self, key: str, rate: str, response: Optional[Response] = None):
+        """Check a limit and raise 429 if it is exceeded"""
+        result = await self.hit(key, rate)
+        headers = rate_limit_headers(result)
+
+        if not result.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Rate limit exceeded: {rate}",
+                headers=headers
+            )
+
+        if response is not None:
+            response.headers.update(headers)
+
+    def limit(self, rate: str, scope: str, key_func: Optional[Callable[[Request], str]] = None):
+        """
+        FastAPI dependency enforcing `rate` per client for one route.
+
+        Usage:
+            @app.post("/auth/verify", dependencies=[Depends(rate_limiter.limit("5/minute", "auth_verify"))])
+        """
+        key_func = key_func or (lambda request: client_ip(request, self.trust_forwarded))
+
+        async def dependency(request: Request, response: Response):
+            await self.enforce(f"{scope}:{key_func(request)}", rate, response)
+
+        return dependency
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "backend": "redis" if self.redis_client and time.monotonic() >= self._redis_down_until else "local",
+        }
+
+
+# Global instance
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter(redis_url: str, redis_timeout: float = 0.05, trust_forwarded: bool = False) -> RateLimiter:
+    """Get or create rate limiter instance"""
+    global _rate_limiter
+    if not _rate_limiter:
+        _rate_limiter = RateLimiter(redis_url, redis_timeout=redis_timeout, trust_forwarded=trust_forwarded)
+    return _rate_limiter
@@ -59,6 +59,28 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserPublicProfile(BaseModel):
+    id: int
+    username: str
+    wallet_address: str
+    user_type: UserType
+    
+    class Config:
+        from_attributes = True
+
+
+# Bulk profile lookup (POST /users/batch)
+USER_BATCH_MAX_IDS = 100
+
+
+class UserBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=USER_BATCH_MAX_IDS)
+
+
+class UserBatchResponse(BaseModel):
+    users: List[UserPublicProfile]
+
+
 # Auth Schemas
 class ChallengeRequest(BaseModel):
     wallet_address: str = Field(..., min_length=42, max_length=42)
@@ -194,7 +216,12 @@ class ErrorResponse(BaseModel):
 # Pagination Response
 class PaginatedJobsResponse(BaseModel):
     jobs: List[JobResponse]
-    total: int
+    total: Optional[int] = None  # omitted with count=none
+    total_is_estimate: bool = False  # count=estimate returned the planner's estimate
     skip: int
     limit: int
-    pages: int
+    pages: Optional[int] = None
+    # Cursor mode (pass next_cursor back as ?cursor= for the next page)
+    next_cursor: Optional[str] = None
+    # Cursor mode, or offset mode without a total
+    has_more: Optional[bool] = None
@@ -0,0 +1,435 @@
+"""
+Request Tracing
+Propagates a W3C trace context (traceparent header, plus X-Request-ID) from
+the API Gateway through every service and records timing spans for incoming
+requests, outbound httpx calls and selected internal steps.
+
+Spans are exported in OTLP/JSON format, either appended to a local file
+(one ExportTraceServiceRequest per line, readable by the OpenTelemetry
+Collector's otlpjsonfile receiver, rotated by size) or POSTed to an OTLP/HTTP
+endpoint. No exporter is configured by default.
+
+Configuration (environment):
+    TRACING_ENABLED         record and export spans (context is always propagated)
+    TRACING_EXPORTER        'none' (default), 'file' or 'otlp'
+    TRACING_FILE_PATH       output file for the file exporter
+    TRACING_FILE_MAX_BYTES  rotate the file once it reaches this size
+    TRACING_FILE_BACKUPS    rotated files kept (path.1 ... path.N)
+    TRACING_OTLP_ENDPOINT   collector base URL for the otlp exporter
+    TRACING_SAMPLE_RATE     fraction of new traces to record (0.0 - 1.0)
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import logging
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+REQUEST_ID_HEADER = "X-Request-ID"
+
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# OTLP span kinds
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+# Set by untraced(): outbound calls in this context get no client span or trace headers
+_suppressed: ContextVar[bool] = ContextVar("tracing_suppressed", default=False)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """Parse a traceparent header into (trace_id, parent_span_id, sampled)"""
+    if not value:
+        return None
+    match = TRACEPARENT_PATTERN.match(value.strip().lower())
+    if not match or match.group(1) == "0" * 32:
+        return None
+    trace_id, span_id, flags = match.groups()
+    return trace_id, span_id, bool(int(flags, 16) & 1)
+
+
+def current_span() -> Optional["Span"]:
+    return _current_span.get()
+
+
+@contextmanager
+def untraced():
+    """Make outbound calls in this block without tracing them (e.g. background health probes)"""
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = (
+        "tracer", "name", "kind", "trace_id", "span_id", "parent_id",
+        "sampled", "attributes", "start_ns", "end_ns", "error",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        kind: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        sampled: bool,
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1_000_000
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_error(self, message: str):
+        self.error = message
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.tracer._record(self)
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KINDS.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class FileSpanExporter:
+    """
+    Appends OTLP/JSON export requests to a local file, one per line.
+    Once the file reaches max_bytes it is rotated to path.1 (path.1 to
+    path.2, ...), keeping at most `backups` old files.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 50_000_000, backups: int = 3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    def _rotate(self):
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def _write(self, line: str):
+        try:
+            if self.max_bytes > 0 and os.path.getsize(self.path) >= self.max_bytes:
+                self._rotate()
+        except FileNotFoundError:
+            pass
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    async def export(self, payload: dict):
+        await asyncio.to_thread(self._write, json.dumps(payload, separators=(",", ":")))
+
+    async def close(self):
+        pass
+
+
+class OTLPHttpExporter:
+    """Sends OTLP/JSON export requests to a collector's /v1/traces endpoint"""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.client = httpx.AsyncClient(timeout=timeout)
+
+    async def export(self, payload: dict):
+        response = await self.client.post(self.url, json=payload)
+        response.raise_for_status()
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class Tracer:
+    """
+    Creates spans and exports finished, sampled ones in batches.
+    Spans are buffered in memory and flushed by a background task, so
+    recording never waits on I/O.
+    """
+
+    def __init__(
+        self,
+        service_name: str,
+        exporter=None,
+        sample_rate: float = 1.0,
+        batch_size: int = 256,
+        flush_interval: float = 2.0,
+        max_queue: int = 10000
+    ):
+        self.service_name = service_name
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._queue: List[Span] = []
+        self._task: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+    async def start(self):
+        if self.exporter and not self._task:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"✅ Tracing enabled for {self.service_name} ({type(self.exporter).__name__})")
+
+    async def shutdown(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self.exporter:
+            await self.exporter.close()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self):
+        while self._queue:
+            batch, self._queue = self._queue[:self.batch_size], self._queue[self.batch_size:]
+            try:
+                await self.exporter.export(self._payload(batch))
+            except Exception as e:
+                logger.warning(f"Span export failed ({len(batch)} spans dropped): {e}")
+
+    def _payload(self, spans: List[Span]) -> dict:
+        return {
+            "resourceSpans": [{
+                "resource": {
+                    "attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]
+                },
+                "scopeSpans": [{
+                    "scope": {"name": "paychain.tracing"},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }]
+        }
+
+    def _record(self, span: Span):
+        if not span.sampled or not self.exporter:
+            return
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._queue.append(span)
+
+    def start_span(
+        self,
+        name: str,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[Tuple[str, str, bool]] = None
+    ) -> Span:
+        """
+        Start a span. The parent is an explicit (trace_id, span_id, sampled)
+        context if given, else the current span, else a new trace is started.
+        """
+        if parent is None:
+            active = _current_span.get()
+            if active is not None:
+                parent = (active.trace_id, active.span_id, active.sampled)
+
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id = secrets.token_hex(16), None
+            sampled = self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+        span = Span(self, name, kind, trace_id, parent_id, sampled, attributes)
+        span.attributes.setdefault("service.name", self.service_name)
+        return span
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", attributes: Optional[Dict[str, Any]] = None):
+        """Time a block as a child of the current span"""
+        span = self.start_span(name, kind, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def async_client(self, **kwargs) -> httpx.AsyncClient:
+        """httpx.AsyncClient whose requests carry the trace context and are timed as client spans"""
+        return httpx.AsyncClient(transport=TracingTransport(self), **kwargs)
+
+
+class TracingTransport(httpx.AsyncHTTPTransport):
+    """httpx transport that injects traceparent/X-Request-ID and records a client span per request"""
+
+    def __init__(self, tracer: Tracer, **kwargs):
+        super().__init__(**kwargs)
+        self.tracer = tracer
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if _suppressed.get():
+            return await super().handle_async_request(request)
+
+        attributes = {
+            "http.method": request.method,
+            "http.url": str(request.url.copy_with(query=None)),
+            "server.address": request.url.host,
+        }
+        with self.tracer.span(f"{request.method} {request.url.host}{request.url.path}", "client", attributes) as span:
+            request.headers[TRACEPARENT_HEADER] = span.traceparent
+            request.headers[REQUEST_ID_HEADER] = span.trace_id
+            response = await super().handle_async_request(request)
+            span.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.set_error(f"HTTP {response.status_code}")
+            return response
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware starting a server span per request. Services continue the
+    trace from the incoming traceparent header; the gateway (continue_trace=False)
+    ignores client-supplied context and starts a new trace.
+    The trace ID is returned to the client as X-Request-ID.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        tracer: Tracer,
+        continue_trace: bool = True,
+        excluded_paths: tuple = ("/health", "/metrics")
+    ):
+        self.app = app
+        self.tracer = tracer
+        self.continue_trace = continue_trace
+        self.excluded_paths = excluded_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.excluded_paths):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        attributes = {"http.method": scope["method"], "http.target": scope["path"]}
+        client_request_id = headers.get(REQUEST_ID_HEADER.lower())
+        if client_request_id:
+            attributes["http.request_id"] = client_request_id[:64]
+
+        span = self.tracer.start_span(
+            f"{scope['method']} {scope['path']}",
+            kind="server",
+            attributes=attributes,
+            parent=parse_traceparent(headers.get(TRACEPARENT_HEADER)) if self.continue_trace else None
+        )
+        token = _current_span.set(span)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.set_error(f"HTTP {message['status']}")
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = span.trace_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+
+# Global instance
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer(service_name: str) -> Tracer:
+    """Get or create the process tracer, configured from TRACING_* environment variables"""
+    global _tracer
+    if not _tracer:
+        exporter = None
+        if os.getenv("TRACING_ENABLED", "true").lower() == "true":
+            exporter_name = os.getenv("TRACING_EXPORTER", "none").lower()
+            if exporter_name == "otlp":
+                exporter = OTLPHttpExporter(os.getenv("TRACING_OTLP_ENDPOINT", "http://otel-collector:4318"))
+            elif exporter_name == "file":
+                exporter = FileSpanExporter(
+                    os.getenv("TRACING_FILE_PATH", "/tmp/paychain-traces.jsonl"),
+                    max_bytes=int(os.getenv("TRACING_FILE_MAX_BYTES", "50000000")),
+                    backups=int(os.getenv("TRACING_FILE_BACKUPS", "3"))
+                )
+        _tracer = Tracer(
+            service_name,
+            exporter=exporter,
+            sample_rate=float(os.getenv("TRACING_SAMPLE_RATE", "1.0"))
+        )
+    return _tracer
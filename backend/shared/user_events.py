@@ -0,0 +1,23 @@
+"""
+User Change Events
+Publishes user profile changes over Redis pub/sub so services holding
+copies of public profiles (e.g. the job service's user cache) can drop them
+"""
+
+from typing import Optional
+
+from .events import EventPublisher
+
+# Redis pub/sub channel carrying {"type": ..., "user_id": ...} messages
+USER_EVENTS_CHANNEL = "user_events"
+
+# Global instance
+_publisher: Optional[EventPublisher] = None
+
+
+def get_user_event_publisher(redis_url: str) -> EventPublisher:
+    """Get or create user event publisher instance"""
+    global _publisher
+    if not _publisher:
+        _publisher = EventPublisher(redis_url, USER_EVENTS_CHANNEL, "user")
+    return _publisher
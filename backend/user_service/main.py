@@ -1,4 +1,4 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Header, Request
+from fastapi import FastAPI, Depends, HTTPException, status, Header, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -10,20 +10,23 @@ import redis.asyncio as redis
 from eth_account.messages import encode_defunct
 from web3 import Web3
 import logging
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 
 from shared.config import get_settings
 from shared.database import get_database
 from shared.schemas import (
     ChallengeRequest, ChallengeResponse,
     VerifyRequest, TokenResponse, RefreshRequest,
-    UserCreate, UserResponse
+    UserCreate, UserResponse,
+    UserBatchRequest, UserBatchResponse, UserPublicProfile
 )
 from shared.auth import create_access_token, create_refresh_token, decode_token
-from shared.auth_guard import get_current_user, get_current_user_optional
+from shared.auth_guard import get_current_user, get_current_user_optional, verify_service_key
 from shared.token_blacklist import get_token_blacklist
+from shared.user_events import get_user_event_publisher
+from shared.rate_limiter import get_rate_limiter
+from shared.tracing import TracingMiddleware, get_tracer
+from shared.deadline import DeadlineMiddleware
+from shared.deadline import get_stats as get_deadline_stats
 from models import User, Session
 
 # Setup logging
@@ -35,12 +38,21 @@ app = FastAPI(title="PayChain User Service", version="1.0.0")
 
 # Settings and database
 settings = get_settings()
-db = get_database(settings.DATABASE_URL)
+db = get_database(
+    settings.DATABASE_URL,
+    settings.DATABASE_REPLICA_URLS,
+    max_replica_lag=settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+    read_your_writes_window=settings.DATABASE_READ_YOUR_WRITES_SECONDS,
+    write_marker_url=settings.REDIS_URL
+)
+tracer = get_tracer("user-service")
 
-# Rate limiter
-limiter = Limiter(key_func=get_remote_address)
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+# Rate limiter (Redis-backed, shared by all replicas)
+rate_limiter = get_rate_limiter(
+    settings.REDIS_URL,
+    redis_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT_MS / 1000,
+    trust_forwarded=settings.RATE_LIMIT_TRUST_FORWARDED
+)
 
 # Redis client for challenge storage
 redis_client = None
@@ -48,6 +60,9 @@ redis_client = None
 # Token blacklist
 blacklist = get_token_blacklist(settings.REDIS_URL)
 
+# Profile change events (the job service caches public profiles)
+user_events = get_user_event_publisher(settings.REDIS_URL)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -57,6 +72,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Remaining time budget from X-Request-Timeout-Ms (set by the gateway and job service)
+app.add_middleware(DeadlineMiddleware)
+
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
 
 # Security headers middleware
 @app.middleware("http")
@@ -92,6 +112,10 @@ async def startup():
     
     redis_client = await redis.from_url(settings.REDIS_URL, decode_responses=True)
     await blacklist.connect()
+    await user_events.connect()
+    await rate_limiter.connect()
+    await db.start()
+    await tracer.start()
     logger.info("✅ User Service started with security enhancements")
 
 
@@ -99,7 +123,10 @@ async def startup():
 async def shutdown():
     await redis_client.close()
     await blacklist.close()
+    await user_events.close()
+    await rate_limiter.close()
     await db.close()
+    await tracer.shutdown()
     logger.info("👋 User Service stopped")
 
 
@@ -109,15 +136,31 @@ async def get_db_session():
         yield session
 
 
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy", "service": "user-service"}
+# Read-only handlers: replica when configured (see shared.database)
+async def get_read_session():
+    async for session in db.get_read_session():
+        yield session
 
 
-@app.post("/auth/challenge", response_model=ChallengeResponse)
-@limiter.limit("10/minute")
-async def get_challenge(request: Request, challenge_req: ChallengeRequest):
+@app.get("/health")
+async def health_check():
+    return {
+        "status": "healthy",
+        "service": "user-service",
+        "deadlines": get_deadline_stats(),
+        "database": db.get_stats()
+    }
+
+
+@app.post(
+    "/auth/challenge",
+    response_model=ChallengeResponse,
+    dependencies=[Depends(rate_limiter.limit("10/minute", "auth_challenge"))]
+)
+async def get_challenge(request: Request, response: Response, challenge_req: ChallengeRequest):
     """Generate signature challenge for MetaMask authentication"""
+    await rate_limiter.enforce(f"auth_challenge:wallet:{challenge_req.wallet_address.lower()}", "10/minute", response)
+    
     try:
         # Generate nonce
         nonce = secrets.token_hex(16)
@@ -151,14 +194,20 @@ Timestamp: {timestamp}"""
         )
 
 
-@app.post("/auth/verify", response_model=TokenResponse)
-@limiter.limit("5/minute")
+@app.post(
+    "/auth/verify",
+    response_model=TokenResponse,
+    dependencies=[Depends(rate_limiter.limit("5/minute", "auth_verify"))]
+)
 async def verify_signature(
     request: Request,
+    response: Response,
     verify_req: VerifyRequest,
     session: AsyncSession = Depends(get_db_session)
 ):
     """Verify MetaMask signature and issue JWT tokens"""
+    await rate_limiter.enforce(f"auth_verify:wallet:{verify_req.wallet_address.lower()}", "5/minute", response)
+    
     try:
         # Retrieve stored challenge
         stored = await redis_client.get(f"challenge:{verify_req.wallet_address}")
@@ -299,6 +348,9 @@ async def signup(
         
         logger.info(f"New user registered: {new_user.username}")
         
+        # Any profile write must publish so cached copies are dropped
+        await user_events.publish("user_created", new_user.id)
+        
         return UserResponse.from_orm(new_user)
         
     except HTTPException:
@@ -315,7 +367,7 @@ async def signup(
 @app.get("/users/me", response_model=UserResponse)
 async def get_me(
     user: dict = Depends(get_current_user),
-    session: AsyncSession = Depends(get_db_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get current authenticated user"""
     try:
@@ -345,8 +397,11 @@ async def get_me(
         )
 
 
-@app.post("/auth/refresh", response_model=TokenResponse)
-@limiter.limit("10/minute")
+@app.post(
+    "/auth/refresh",
+    response_model=TokenResponse,
+    dependencies=[Depends(rate_limiter.limit("10/minute", "auth_refresh"))]
+)
 async def refresh_access_token(
     request: Request,
     refresh_req: RefreshRequest,
@@ -453,11 +508,29 @@ async def logout(
         )
 
 
+@app.post("/users/batch", response_model=UserBatchResponse)
+async def get_users_batch(
+    batch_request: UserBatchRequest,
+    _: bool = Depends(verify_service_key),
+    session: AsyncSession = Depends(get_db_session)
+):
+    """
+    Public profiles (username, wallet, type) for up to 100 user IDs in one call.
+    Unknown IDs are left out of the result. Internal: requires a service API key.
+    """
+    result = await session.execute(
+        select(User).where(User.id.in_(set(batch_request.ids)))
+    )
+    return UserBatchResponse(
+        users=[UserPublicProfile.from_orm(user) for user in result.scalars().all()]
+    )
+
+
 @app.get("/users/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
     current_user: Optional[dict] = Depends(get_current_user_optional),
-    session: AsyncSession = Depends(get_db_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
     Get user by ID.
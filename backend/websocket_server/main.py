@@ -13,6 +13,7 @@ from connection_manager import ConnectionManager
 import sys
 sys.path.insert(0, '/app')
 from shared.auth_guard import verify_service_key
+from shared.tracing import TracingMiddleware, get_tracer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,6 +23,8 @@ app = FastAPI(title="PayChain WebSocket Server", version="1.0.0")
 # Connection manager
 manager = ConnectionManager()
 
+tracer = get_tracer("websocket-server")
+
 CORS_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "http://localhost:5173").split(",")
 # WS_SERVICE_API_KEY now managed by Central Auth Guard
 
@@ -33,6 +36,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
 
 # Security headers middleware
 @app.middleware("http")
@@ -68,9 +73,16 @@ class NotifyMessage(BaseModel):
 
 @app.on_event("startup")
 async def startup():
+    await tracer.start()
     logger.info("✅ WebSocket Server started with security enhancements")
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    await tracer.shutdown()
+    logger.info("👋 WebSocket Server stopped")
+
+
 # Service API key verification now handled by Central Auth Guard
 # No need for custom verify_service_key function
 
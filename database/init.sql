@@ -4,6 +4,7 @@
 
 -- Enable required extensions
 CREATE EXTENSION IF NOT EXISTS pgcrypto;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- ============================================
 -- USERS TABLE
@@ -62,6 +63,9 @@ CREATE TABLE jobs (
     status VARCHAR(20) NOT NULL DEFAULT 'open' CHECK (status IN ('open', 'in_progress', 'completed', 'expired', 'cancelled')),
     payment_status VARCHAR(20) DEFAULT 'pending' CHECK (payment_status IN ('pending', 'locked', 'released', 'refunded', 'failed')),
     
+    -- Full-text search (title weighted above description), set by trigger
+    search_vector TSVECTOR,
+    
     -- Timestamps
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
@@ -72,11 +76,41 @@ CREATE INDEX idx_jobs_status ON jobs(status) WHERE status = 'open';
 CREATE INDEX idx_jobs_employer ON jobs(employer_id, status);
 CREATE INDEX idx_jobs_worker ON jobs(worker_id, status);
 CREATE INDEX idx_jobs_type ON jobs(job_type);
-CREATE INDEX idx_jobs_pay ON jobs(pay_amount_usd DESC);
-CREATE INDEX idx_jobs_created ON jobs(created_at DESC);
+-- Keyset pagination: (sort column, id) for each GET /jobs sort_by
+CREATE INDEX idx_jobs_pay ON jobs(pay_amount_usd DESC, id DESC);
+CREATE INDEX idx_jobs_created ON jobs(created_at DESC, id DESC);
+CREATE INDEX idx_jobs_title ON jobs(title, id);
+CREATE INDEX idx_jobs_open_created ON jobs(created_at DESC, id DESC) WHERE status = 'open';
 CREATE INDEX idx_jobs_deadline ON jobs(deadline) WHERE status = 'in_progress';
 CREATE INDEX idx_jobs_status_type_pay ON jobs(status, job_type, pay_amount_usd DESC);
 CREATE UNIQUE INDEX idx_jobs_worker_unique ON jobs(id, worker_id) WHERE status = 'in_progress';
+-- Search: ranked full-text match, trigram similarity on titles for short/partial terms
+CREATE INDEX idx_jobs_search ON jobs USING GIN (search_vector);
+CREATE INDEX idx_jobs_title_trgm ON jobs USING GIN (title gin_trgm_ops);
+
+-- ============================================
+-- ESCROW OUTBOX (escrow locks written with the job, sent by the job service)
+-- ============================================
+CREATE TABLE escrow_outbox (
+    id SERIAL PRIMARY KEY,
+    job_id INTEGER NOT NULL UNIQUE REFERENCES jobs(id) ON DELETE CASCADE,
+    
+    -- Lock request for the payment service (employer wallet, amount, time limit)
+    payload JSONB NOT NULL,
+    
+    -- Delivery
+    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'done', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    last_error TEXT,
+    
+    -- Timestamps
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Worker claims due rows in order
+CREATE INDEX idx_escrow_outbox_due ON escrow_outbox(next_attempt_at, id) WHERE status = 'pending';
 
 -- ============================================
 -- TRANSACTIONS TABLE
@@ -192,6 +226,11 @@ CREATE TRIGGER update_jobs_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+CREATE TRIGGER update_escrow_outbox_updated_at
+    BEFORE UPDATE ON escrow_outbox
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
 -- Auto-calculate deadline on job acceptance
 CREATE OR REPLACE FUNCTION calculate_job_deadline()
 RETURNS TRIGGER AS $$
@@ -207,3 +246,19 @@ CREATE TRIGGER set_job_deadline
     BEFORE UPDATE ON jobs
     FOR EACH ROW
     EXECUTE FUNCTION calculate_job_deadline();
+
+-- Keep the job search vector in sync with title/description
+CREATE OR REPLACE FUNCTION update_job_search_vector()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_vector =
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER set_job_search_vector
+    BEFORE INSERT OR UPDATE OF title, description ON jobs
+    FOR EACH ROW
+    EXECUTE FUNCTION update_job_search_vector();
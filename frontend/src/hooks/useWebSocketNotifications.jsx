@@ -268,6 +268,30 @@ export const useWebSocketNotifications = () => {
       }
     }
 
+    // ==================== JOB PAYMENT STATUS ====================
+    // Escrow lock for a new job finished (sent only to its employer)
+    const handleJobPaymentStatus = (data) => {
+      if (!isActive) return
+
+      if (data.payment_status === 'locked') {
+        toast.success('🔒 Funds locked in escrow - your job is live', {
+          id: `job-payment-${data.job_id}`,
+          duration: 5000,
+        })
+      } else if (data.payment_status === 'failed') {
+        toast.error('❌ Could not lock funds for your job', {
+          id: `job-payment-${data.job_id}`,
+          duration: 6000,
+        })
+      }
+
+      if (isActive) {
+        queryClient.invalidateQueries({ queryKey: ['job', data.job_id] })
+        queryClient.invalidateQueries({ queryKey: ['my-jobs'] })
+        queryClient.invalidateQueries({ queryKey: ['wallet-balance'] })
+      }
+    }
+
     // ==================== JOB CANCELLED REFUNDED ====================
     const handleJobCancelledRefunded = (data) => {
       if (!isActive) return
@@ -308,9 +332,20 @@ export const useWebSocketNotifications = () => {
     const handleChecklistUpdated = (data) => {
       if (!isActive) return
 
-      // Update the job cache immediately for real-time UI updates
+      // Patch the changed item into the cached job (the event carries only that item)
       if (isActive && data.job_id) {
-        queryClient.invalidateQueries({ queryKey: ['job', data.job_id.toString()] })
+        const queryKey = ['job', data.job_id.toString()]
+        const cachedJob = queryClient.getQueryData(queryKey)
+        if (cachedJob && Array.isArray(cachedJob.checklist) && data.item) {
+          queryClient.setQueryData(queryKey, {
+            ...cachedJob,
+            checklist: cachedJob.checklist.map((item) =>
+              item.id === data.item.id ? data.item : item
+            ),
+          })
+        } else {
+          queryClient.invalidateQueries({ queryKey })
+        }
         
         // Show subtle notification to employer
         if (user?.user_type === 'employer' && data.employer_id === parseInt(user.sub)) {
@@ -344,6 +379,7 @@ export const useWebSocketNotifications = () => {
       on('job_reopened', handleJobReopened),
       on('payment_confirmed', handlePaymentConfirmed),
       on('job_cancelled_refunded', handleJobCancelledRefunded),
+      on('job_payment_status', handleJobPaymentStatus),
       on('checklist_updated', handleChecklistUpdated),
     ]
 
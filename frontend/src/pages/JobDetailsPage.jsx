@@ -120,10 +120,12 @@ const JobDetailsPage = () => {
     onSuccess: (data) => {
       // Update cache with actual server response to ensure sync
       const currentJob = queryClient.getQueryData(['job', id])
-      if (currentJob && data.checklist) {
+      if (currentJob && data.item) {
         queryClient.setQueryData(['job', id], {
           ...currentJob,
-          checklist: data.checklist,
+          checklist: currentJob.checklist.map((item) =>
+            item.id === data.item.id ? data.item : item
+          ),
         })
       }
     },
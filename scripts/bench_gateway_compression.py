@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+API Gateway compression benchmark: bytes saved vs CPU cost on /jobs pages.
+
+Builds PaginatedJobsResponse-shaped pages with varied text, compresses them
+with the gateway's compression settings (gzip levels and, if installed,
+brotli qualities) and reports compressed size and CPU time per page.
+
+Usage:
+    pip install -r backend/api_gateway/requirements.txt
+    python scripts/bench_gateway_compression.py [--page-sizes 10,20,50] [--rounds 200]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend", "api_gateway"))
+
+from compression import brotli, compress
+
+WORDS = (
+    "build responsive landing page api backend frontend design logo react "
+    "python smart contract audit deploy testnet wallet integration database "
+    "migration dashboard analytics report copywriting translation video edit "
+    "animation figma mockup onboarding flow payment checkout bug fix refactor"
+).split()
+
+
+def build_page(job_count: int, rng: random.Random) -> bytes:
+    jobs = []
+    for i in range(job_count):
+        checklist_size = rng.randint(3, 10)
+        jobs.append({
+            "id": i + 1,
+            "employer_id": rng.randint(1, 500),
+            "employer_username": f"employer{rng.randint(1, 500)}",
+            "worker_id": None,
+            "worker_username": None,
+            "title": " ".join(rng.choices(WORDS, k=6)).capitalize(),
+            "description": " ".join(rng.choices(WORDS, k=rng.randint(60, 200))),
+            "job_type": rng.choice(["development", "design", "writing", "marketing"]),
+            "pay_amount_usd": round(rng.uniform(50, 5000), 2),
+            "pay_amount_eth": round(rng.uniform(0.01, 2), 6),
+            "platform_fee_usd": round(rng.uniform(1, 100), 2),
+            "platform_fee_eth": round(rng.uniform(0.0001, 0.04), 6),
+            "time_limit_hours": rng.choice([24, 48, 72, 168]),
+            "accepted_at": None,
+            "deadline": None,
+            "completed_at": None,
+            "checklist": [
+                {"id": n, "text": " ".join(rng.choices(WORDS, k=5)), "completed": False}
+                for n in range(1, checklist_size + 1)
+            ],
+            "contract_address": None,
+            "status": "open",
+            "payment_status": "locked",
+            "created_at": "2025-01-15T10:30:00.000000",
+            "updated_at": "2025-01-15T10:30:00.000000",
+        })
+    return json.dumps({
+        "jobs": jobs,
+        "total": 1000,
+        "skip": 0,
+        "limit": job_count,
+        "pages": 1000 // job_count,
+    }).encode()
+
+
+def measure(body: bytes, encoding: str, level: int, rounds: int) -> tuple:
+    kwargs = {"gzip_level": level} if encoding == "gzip" else {"brotli_quality": level}
+    start = time.process_time()
+    for _ in range(rounds):
+        compressed = compress(body, encoding, **kwargs)
+    cpu_ms = (time.process_time() - start) / rounds * 1000
+    return len(compressed), cpu_ms
+
+
+def main(args):
+    rng = random.Random(42)
+    settings = [("gzip", level) for level in (1, 6, 9)]
+    if brotli is not None:
+        settings += [("br", quality) for quality in (1, 4, 11)]
+    else:
+        print("brotli not installed - gzip only\n")
+
+    print(f"{'jobs':>5} {'raw KB':>8} {'encoding':>10} {'KB':>8} {'saved':>7} {'cpu ms/page':>12}")
+    for page_size in (int(n) for n in args.page_sizes.split(",")):
+        body = build_page(page_size, rng)
+        for encoding, level in settings:
+            # Max brotli quality is much slower; fewer rounds keep the run short
+            rounds = max(args.rounds // 20, 1) if (encoding, level) == ("br", 11) else args.rounds
+            size, cpu_ms = measure(body, encoding, level, rounds)
+            print(
+                f"{page_size:>5} {len(body) / 1024:>8.1f} {f'{encoding}-{level}':>10} "
+                f"{size / 1024:>8.1f} {1 - size / len(body):>7.1%} {cpu_ms:>12.3f}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-sizes", default="10,20,50", help="jobs per page, comma-separated")
+    parser.add_argument("--rounds", type=int, default=200)
+    main(parser.parse_args())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+API Gateway proxy benchmark: buffered vs streaming mode.
+
+Starts a fake job service that serves a large /jobs page, then drives the
+gateway app in-process against it in both proxy modes and reports throughput.
+The response cache and request coalescing are switched off so every request
+goes through proxy_request and the two proxy implementations are compared.
+
+Usage:
+    pip install -r backend/api_gateway/requirements.txt
+    python scripts/bench_gateway_proxy.py [--requests 500] [--concurrency 20] [--jobs 200]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+sys.path.insert(0, os.path.join(ROOT, "backend", "api_gateway"))
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import Response
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def build_upstream(job_count: int) -> FastAPI:
+    """Fake job service returning a PaginatedJobsResponse-shaped page"""
+    page = json.dumps({
+        "jobs": [
+            {
+                "id": i,
+                "employer_id": 1,
+                "employer_username": "employer",
+                "title": f"Benchmark job {i}",
+                "description": "Build a responsive landing page. " * 40,
+                "job_type": "development",
+                "pay_amount_usd": 500.0,
+                "checklist": [{"id": n, "text": f"Step {n}", "completed": False} for n in range(1, 11)],
+                "status": "open",
+                "payment_status": "locked",
+            }
+            for i in range(job_count)
+        ],
+        "total": job_count,
+        "skip": 0,
+        "limit": job_count,
+        "pages": 1,
+    }).encode()
+
+    upstream = FastAPI()
+
+    @upstream.get("/jobs")
+    async def jobs():
+        return Response(content=page, media_type="application/json")
+
+    return upstream
+
+
+async def run_mode(gateway, mode: str, total: int, concurrency: int) -> dict:
+    gateway.PROXY_MODE = mode
+    transport = httpx.ASGITransport(app=gateway.app)
+    semaphore = asyncio.Semaphore(concurrency)
+    received = 0
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+        async def one():
+            nonlocal received
+            async with semaphore:
+                response = await client.get("/jobs")
+                response.raise_for_status()
+                received += len(response.content)
+
+        # Warm up pools
+        await asyncio.gather(*(one() for _ in range(concurrency)))
+        received = 0
+
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+
+    return {
+        "mode": mode,
+        "req_per_s": total / elapsed,
+        "mb_per_s": received / elapsed / 1_000_000,
+        "cpu_ms_per_req": cpu / total * 1000,
+    }
+
+
+async def main(args):
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(build_upstream(args.jobs), port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    os.environ["JOB_SERVICE_URL"] = f"http://127.0.0.1:{port}"
+    # Cached/coalesced GETs are always buffered; keep /jobs on proxy_request
+    os.environ["GATEWAY_CACHE_ENABLED"] = "false"
+    os.environ["GATEWAY_COALESCE_ROUTES"] = ""
+    import main as gateway
+
+    gateway.COALESCE_ROUTES.clear()
+    gateway.response_cache.redis_client = None
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    await gateway.upstreams.start()
+    try:
+        results = [
+            await run_mode(gateway, mode, args.requests, args.concurrency)
+            for mode in ("buffered", "streaming")
+        ]
+    finally:
+        await gateway.upstreams.close()
+        server.should_exit = True
+
+    print(f"{'mode':<10} {'req/s':>10} {'MB/s':>10} {'cpu ms/req':>12}")
+    for r in results:
+        print(f"{r['mode']:<10} {r['req_per_s']:>10.1f} {r['mb_per_s']:>10.2f} {r['cpu_ms_per_req']:>12.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--jobs", type=int, default=200, help="jobs per page")
+    asyncio.run(main(parser.parse_args()))